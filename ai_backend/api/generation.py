@@ -5,22 +5,29 @@ Handle AI image generation with furniture and decorative items
 """
 
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import Dict
 from ai_backend.models import ImageGenerationRequest, ImageGenerationResponse
 from ai_backend.services.image_generator import generate_room_design
+from ai_backend.services.space_calculator import SpaceCalculator
 from ai_backend.services.storage import upload_to_s3
+from ai_backend.services.generation_jobs import generation_queue, FAILED
 from ai_backend.api.upload import user_sessions
 import time
+import json
+import asyncio
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Seconds between SSE keep-alive comments
+SSE_KEEPALIVE_SECONDS = 15
 
-@router.post("/generate", response_model=ImageGenerationResponse)
-async def generate_image(request: ImageGenerationRequest, req: Request):
-    """
-    Step 8: Generate final room design image with furniture and optional decorative items
-    """
+
+def _prepare_generation(request: ImageGenerationRequest):
+    """Validate a generation request; returns (session, selected furniture, decorative items)"""
     session = user_sessions.get(request.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -41,25 +48,44 @@ async def generate_image(request: ImageGenerationRequest, req: Request):
     # ✅ Get decorative items (optional)
     decorative_items = getattr(session, 'decorative_items', [])
     
-    logger.info(f"🎨 Generating design with {len(selected_furniture)} furniture items")
-    if decorative_items:
-        logger.info(f"   + {len(decorative_items)} decorative items")
-    
-    start_time = time.time()
+    return session, selected_furniture, decorative_items
+
+
+def _generation_job(request: ImageGenerationRequest, session, selected_furniture, decorative_items):
+    """Job body: generation runs on the event loop, the blocking S3 upload in a worker thread"""
     
-    try:
+    async def run(progress) -> ImageGenerationResponse:
+        logger.info(f"🎨 Generating design with {len(selected_furniture)} furniture items")
+        if decorative_items:
+            logger.info(f"   + {len(decorative_items)} decorative items")
+        
+        # Planned positions of the selected furniture, as placement guidance
+        layout_summary = None
+        if session.square_feet and session.furniture_selections:
+            layout_summary = SpaceCalculator.plan_layout(
+                session.length,
+                session.width,
+                session.furniture_selections,
+                session.room_type
+            )["summary"]
+        
+        start_time = time.time()
+        
         # Generate image with furniture and decorative items
-        generated_path = generate_room_design(
+        progress("generating")
+        generated_path = await generate_room_design(
             room_image_url=session.room_image_url,
             prompt=request.prompt,
             theme=session.theme,
             room_type=session.room_type,
             furniture_items=selected_furniture,
-            decorative_items=decorative_items  # ✅ Pass decorative items
+            decorative_items=decorative_items,  # ✅ Pass decorative items
+            layout_summary=layout_summary
         )
         
         # Upload to S3
-        generated_url = upload_to_s3(generated_path, folder="generated")
+        progress("uploading")
+        generated_url = await asyncio.to_thread(upload_to_s3, generated_path, folder="generated")
         
         # Save to session
         session.generated_images.append(generated_url)
@@ -78,10 +104,96 @@ async def generate_image(request: ImageGenerationRequest, req: Request):
             generation_time_seconds=generation_time,
             message=f"Room design with {len(selected_furniture)} furniture + {len(decorative_items)} decorative items generated"
         )
-        
-    except Exception as e:
-        logger.error(f"❌ Generation failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Image generation failed: {str(e)}")
+    
+    return run
+
+
+def _submit(request: ImageGenerationRequest):
+    """Validate and queue a generation job"""
+    session, selected_furniture, decorative_items = _prepare_generation(request)
+    
+    try:
+        return generation_queue.submit(
+            request.session_id,
+            _generation_job(request, session, selected_furniture, decorative_items)
+        )
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Too many generations in progress, try again shortly")
+
+
+def _job_status(job) -> Dict:
+    return {
+        "success": job.status != FAILED,
+        **job.to_dict(),
+        "queue_position": generation_queue.position(job)
+    }
+
+
+@router.post("/generate", response_model=ImageGenerationResponse)
+async def generate_image(request: ImageGenerationRequest, req: Request):
+    """
+    Step 8: Generate final room design image with furniture and optional decorative items
+    
+    Runs on the generation queue and waits for the result; use
+    /generate/jobs to get a job id back immediately instead.
+    """
+    job = await generation_queue.wait(_submit(request))
+    
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=f"Image generation failed: {job.error}")
+    
+    return job.result
+
+
+@router.post("/generate/jobs", status_code=202)
+async def enqueue_generation(request: ImageGenerationRequest):
+    """Queue a generation and return its job id"""
+    job = _submit(request)
+    
+    return {
+        **_job_status(job),
+        "status_url": f"/api/generation/jobs/{job.id}",
+        "events_url": f"/api/generation/jobs/{job.id}/events",
+        "message": "Generation queued"
+    }
+
+
+def _get_job(job_id: str):
+    """Get job or raise error"""
+    job = generation_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_generation_job(job_id: str):
+    """Status (and result once completed) of a generation job"""
+    return _job_status(_get_job(job_id))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_generation_job(job_id: str):
+    """Server-sent events with the job status on every change until it finishes"""
+    job = _get_job(job_id)
+    
+    async def events():
+        while True:
+            # Snapshot before yielding: the job may change while the client reads,
+            # and the terminal status must still be sent
+            version, done = job.version, job.done
+            yield f"data: {json.dumps(jsonable_encoder(_job_status(job)))}\n\n"
+            if done:
+                return
+            # Comment line as keep-alive while nothing changes
+            while not await job.wait_for_change(timeout=SSE_KEEPALIVE_SECONDS, since=version):
+                yield ": keep-alive\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/history/{session_id}")
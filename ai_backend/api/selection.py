@@ -1010,8 +1010,9 @@ from ai_backend.models import (
     FurnitureSelectionRequest, BulkFurnitureSelectionRequest,
     BulkFurnitureSelectionResponse
 )
-from ai_backend.config import THEMES, ROOM_TYPES
+from ai_backend.config import THEMES, ROOM_TYPES, ESTIMATE_BATCH_MODE
 from ai_backend.services.space_calculator import SpaceCalculator
+from ai_backend.services.product_service import extract_domain
 from ai_backend.api.upload import user_sessions
 import logging
 
@@ -1026,16 +1027,6 @@ def get_session(session_id: str):
     return user_sessions[session_id]
 
 
-def _extract_domain(url: str) -> str:
-    """Helper: Extract domain from URL"""
-    if not url:
-        return ""
-    domain = url.replace("https://", "").replace("http://", "")
-    domain = domain.split("/")[0]
-    domain = domain.replace("www.", "")
-    return domain
-
-
 # =================================================================
 # STEP 2: SELECT ROOM TYPE
 # =================================================================
@@ -1128,33 +1119,11 @@ async def get_available_furniture(session_id: str, request: Request):
         raise HTTPException(status_code=400, detail="Please select theme first")
     
     product_service = request.app.state.product_service
-    theme_domains = [_extract_domain(w) for w in session.theme_websites]
-    
-    logger.info(f"🔍 Finding furniture from {len(theme_domains)} theme websites")
     
-    matching_products = []
-    for product in product_service.products:
-        product_domain = _extract_domain(product.get("websiteLink", ""))
-        if product_domain in theme_domains:
-            matching_products.append(product)
-    
-    furniture_catalog = {}
-    for product in matching_products:
-        prod_type = product.get("type", "Unknown")
-        prod_subtype = product.get("subTypes", "Unknown")
-        
-        if prod_type == "Unknown" or prod_subtype == "Unknown":
-            continue
-        
-        if prod_type not in furniture_catalog:
-            furniture_catalog[prod_type] = set()
-        
-        furniture_catalog[prod_type].add(prod_subtype)
+    logger.info(f"🔍 Finding furniture from {len(session.theme_websites)} theme websites")
     
-    furniture_catalog = {
-        type_name: sorted(list(subtypes))
-        for type_name, subtypes in sorted(furniture_catalog.items())
-    }
+    theme_catalog = product_service.get_theme_catalog(session.theme)
+    furniture_catalog = theme_catalog["furniture_catalog"]
     
     logger.info(f"✅ Catalog: {len(furniture_catalog)} types")
     
@@ -1164,7 +1133,7 @@ async def get_available_furniture(session_id: str, request: Request):
         "theme": session.theme,
         "furniture_catalog": furniture_catalog,
         "total_types": len(furniture_catalog),
-        "total_products": len(matching_products),
+        "total_products": theme_catalog["total_products"],
         "message": f"Available furniture from {session.theme} theme"
     }
 
@@ -1182,19 +1151,9 @@ async def get_furniture_subtypes_for_type(
         raise HTTPException(status_code=400, detail="Select theme first")
     
     product_service = request.app.state.product_service
-    theme_domains = [_extract_domain(w) for w in session.theme_websites]
-    
-    subtypes = set()
-    for product in product_service.products:
-        product_domain = _extract_domain(product.get("websiteLink", ""))
-        prod_type = product.get("type", "")
-        
-        if product_domain in theme_domains and prod_type.lower() == furniture_type.lower():
-            prod_subtype = product.get("subTypes", "")
-            if prod_subtype:
-                subtypes.add(prod_subtype)
+    theme_domains = [extract_domain(w) for w in session.theme_websites]
     
-    subtypes_list = sorted(list(subtypes))
+    subtypes_list = product_service.get_subtypes_for_domains(theme_domains, furniture_type)
     
     if not subtypes_list:
         raise HTTPException(status_code=404, detail=f"No '{furniture_type}' found")
@@ -1250,38 +1209,39 @@ async def select_furniture(req: FurnitureSelectionRequest, request: Request):
     
     product_service = request.app.state.product_service
     
-    available = product_service.by_type.get(req.furniture_type, [])
-    if not available:
+    if not product_service.has_type(req.furniture_type):
         raise HTTPException(status_code=404, detail=f"Type '{req.furniture_type}' not found")
     
     logger.info(f"🤖 Estimating: {req.subtype} ({req.furniture_type})")
     
-    dimensions = SpaceCalculator.estimate_furniture_size(
+    dimensions = await SpaceCalculator.estimate_furniture_size(
         req.furniture_type,
         req.subtype,
-        session.square_feet  # room area in sq cm
+        session.square_feet,  # room area in sq cm
+        product_service
     )
     
+    furniture_item = {
+        "type": req.furniture_type,
+        "subtype": req.subtype,
+        "dimensions": dimensions,
+        "sqcm": dimensions["sqcm"]
+    }
+    
     validation = SpaceCalculator.validate_furniture_fit(
         session.length,
         session.width,
         session.square_feet,
         session.furniture_selections,
-        dimensions
+        furniture_item,
+        current_sqcm=session.furniture_total_sqft,
+        room_type=session.room_type
     )
     
     if not validation["fits"]:
         raise HTTPException(status_code=400, detail=validation["message"])
     
-    furniture_item = {
-        "type": req.furniture_type,
-        "subtype": req.subtype,
-        "dimensions": dimensions,
-        "sqcm": dimensions["sqcm"]
-    }
-    
-    session.furniture_selections.append(furniture_item)
-    session.furniture_total_sqft = validation["total_sqcm"]  # Update with sq cm
+    session.add_furniture(furniture_item)
     
     logger.info(f"✅ Added: {req.subtype} ({dimensions['sqcm']:.2f} sq cm)")
     
@@ -1313,13 +1273,24 @@ async def select_furniture_bulk(req: BulkFurnitureSelectionRequest, request: Req
     failed_items = []
     temp_selections = []
     
-    # Validate and estimate all items
+    # Estimate every known type in one go (duplicates estimated once)
+    estimate = SpaceCalculator.estimate_batch if ESTIMATE_BATCH_MODE else SpaceCalculator.estimate_many
+    estimates = await estimate(
+        [
+            (item.furniture_type, item.subtype)
+            for item in req.furniture_items
+            if product_service.has_type(item.furniture_type)
+        ],
+        session.square_feet,  # room area in sq cm
+        product_service
+    )
+    
+    # Validate all items in request order
     for idx, item in enumerate(req.furniture_items, 1):
         logger.info(f"\n📦 Item {idx}/{len(req.furniture_items)}: {item.subtype}")
         
         try:
-            available = product_service.by_type.get(item.furniture_type, [])
-            if not available:
+            if not product_service.has_type(item.furniture_type):
                 failed_items.append({
                     "furniture_type": item.furniture_type,
                     "subtype": item.subtype,
@@ -1327,16 +1298,14 @@ async def select_furniture_bulk(req: BulkFurnitureSelectionRequest, request: Req
                 })
                 continue
             
-            dimensions = SpaceCalculator.estimate_furniture_size(
-                item.furniture_type,
-                item.subtype,
-                session.square_feet  # room area in sq cm
-            )
+            dimensions = estimates[(item.furniture_type, item.subtype)]
+            if isinstance(dimensions, Exception):
+                raise dimensions
             
             furniture_item = {
                 "type": item.furniture_type,
                 "subtype": item.subtype,
-                "dimensions": dimensions,
+                "dimensions": dict(dimensions),
                 "sqcm": dimensions["sqcm"]
             }
             
@@ -1351,33 +1320,30 @@ async def select_furniture_bulk(req: BulkFurnitureSelectionRequest, request: Req
             })
             logger.error(f"   ❌ {e}")
     
-    # Validate total space
+    # Validate total space and layout
     if temp_selections:
-        total_new_sqcm = sum(item["sqcm"] for item in temp_selections)
-        current_sqcm = getattr(session, 'furniture_total_sqft', 0.0)  # ✅ Safe access with default
-        combined_total = current_sqcm + total_new_sqcm
-        
-        room_sqcm = session.square_feet
-        usage_percent = (combined_total / room_sqcm) * 100
-        remaining_sqcm = room_sqcm - combined_total
-        
-        from ai_backend.config import MAX_ROOM_USAGE_PERCENT
+        validation = SpaceCalculator.validate_furniture_fit(
+            session.length,
+            session.width,
+            session.square_feet,
+            session.furniture_selections,
+            temp_selections,
+            current_sqcm=session.furniture_total_sqft,
+            room_type=session.room_type
+        )
+        usage_percent = validation["usage_percent"]
+        remaining_sqcm = validation["remaining_sqcm"]
         
-        logger.info(f"\n📊 Space: {combined_total:.2f} sq cm ({usage_percent:.1f}%)")
+        logger.info(f"\n📊 Space: {validation['total_sqcm']:.2f} sq cm ({usage_percent:.1f}%)")
         
-        if usage_percent > MAX_ROOM_USAGE_PERCENT:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Room too crowded! Usage: {usage_percent:.1f}% (max: {MAX_ROOM_USAGE_PERCENT}%)"
-            )
+        if not validation["fits"]:
+            raise HTTPException(status_code=400, detail=validation["message"])
         
         # Add all items
         for item in temp_selections:
-            session.furniture_selections.append(item)
+            session.add_furniture(item)
             added_items.append(item)
         
-        session.furniture_total_sqft = combined_total
-        
         logger.info(f"✅ Added {len(added_items)} items, {len(failed_items)} failed")
         
         return BulkFurnitureSelectionResponse(
@@ -1402,8 +1368,7 @@ async def remove_furniture(session_id: str, index: int):
     if index < 0 or index >= len(session.furniture_selections):
         raise HTTPException(status_code=400, detail=f"Invalid index")
     
-    removed = session.furniture_selections.pop(index)
-    session.furniture_total_sqft = sum(item.get("sqcm", 0) for item in session.furniture_selections)
+    removed = session.remove_furniture(index)
     
     logger.info(f"🗑️ Removed: {removed['subtype']}")
     
@@ -1420,9 +1385,7 @@ async def clear_all_furniture(session_id: str):
     """Clear all furniture"""
     session = get_session(session_id)
     
-    count = len(session.furniture_selections)
-    session.furniture_selections = []
-    session.furniture_total_sqft = 0.0
+    count = session.clear_furniture()
     
     logger.info(f"🗑️ Cleared {count} items")
     
@@ -1447,6 +1410,7 @@ async def list_selected_furniture(session_id: str):
         "furniture_items": session.furniture_selections,
         "count": len(session.furniture_selections),
         "total_sqcm": round(session.furniture_total_sqft, 2),
+        "by_type": session.furniture_by_type,
         "room_sqcm": session.square_feet,
         "usage_percent": round(usage_percent, 2),
         "remaining_sqcm": round(session.square_feet - session.furniture_total_sqft, 2) if session.square_feet else 0,
@@ -1454,6 +1418,28 @@ async def list_selected_furniture(session_id: str):
     }
 
 
+@router.get("/furniture/layout/{session_id}")
+async def get_furniture_layout(session_id: str):
+    """Suggested placement of the selected furniture in the room"""
+    session = get_session(session_id)
+    
+    if not session.square_feet:
+        raise HTTPException(status_code=400, detail="Set room dimensions first")
+    
+    layout = SpaceCalculator.plan_layout(
+        session.length,
+        session.width,
+        session.furniture_selections,
+        session.room_type
+    )
+    
+    return {
+        "success": True,
+        **layout,
+        "message": f"Placed {len(layout['placements'])} of {len(session.furniture_selections)} items"
+    }
+
+
 # =================================================================
 # GET SESSION INFO
 # =================================================================
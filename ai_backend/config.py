@@ -11,6 +11,7 @@ load_dotenv()
 
 # API Keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_S3_BUCKET = os.getenv("AWS_S3_BUCKET")
@@ -20,6 +21,32 @@ FAL_API_KEY = os.getenv("FAL_API_KEY")
 # PRODUCT_API_URL = "http://206.162.244.175:5008/api/v1/products"
 PRODUCT_API_URL = "http://72.60.126.182:5000/api/v1/products"
 
+# Parse the catalog response incrementally instead of response.json()
+PRODUCT_API_STREAMING = os.getenv("PRODUCT_API_STREAMING", "true").lower() == "true"
+
+# Paginated catalog fetch (page size 0 = single request)
+PRODUCT_API_PAGE_SIZE = int(os.getenv("PRODUCT_API_PAGE_SIZE", "0"))
+PRODUCT_API_PAGE_PARAM = os.getenv("PRODUCT_API_PAGE_PARAM", "page")
+PRODUCT_API_LIMIT_PARAM = os.getenv("PRODUCT_API_LIMIT_PARAM", "limit")
+PRODUCT_API_FETCH_CONCURRENCY = int(os.getenv("PRODUCT_API_FETCH_CONCURRENCY", "4"))
+PRODUCT_API_PAGE_RETRIES = int(os.getenv("PRODUCT_API_PAGE_RETRIES", "3"))
+
+# Keep the catalog in NumPy columns instead of raw product dicts
+PRODUCT_STORE_COLUMNAR = os.getenv("PRODUCT_STORE_COLUMNAR", "false").lower() == "true"
+
+# Background catalog refresh (0 disables)
+PRODUCT_REFRESH_INTERVAL_SECONDS = float(os.getenv("PRODUCT_REFRESH_INTERVAL_SECONDS", "1800"))
+# Query parameter for fetching only products updated since a cursor (empty = full refetch)
+PRODUCT_API_UPDATED_SINCE_PARAM = os.getenv("PRODUCT_API_UPDATED_SINCE_PARAM", "")
+# Directory where one worker publishes the columnar catalog for all workers to
+# memory-map, e.g. /dev/shm/product_catalog (empty = per-process catalog)
+PRODUCT_SHARED_CATALOG_DIR = os.getenv("PRODUCT_SHARED_CATALOG_DIR", "")
+# Products with a parseable size needed before a subtype's median footprint is used
+PRODUCT_FOOTPRINT_MIN_SAMPLES = int(os.getenv("PRODUCT_FOOTPRINT_MIN_SAMPLES", "3"))
+# Local catalog snapshot directory loaded on startup before the network refresh
+# (empty disables); keep it in a directory owned by the app user
+PRODUCT_SNAPSHOT_PATH = os.getenv("PRODUCT_SNAPSHOT_PATH", "")
+
 # Themes with Websites
 THEMES: Dict[str, List[str]] = {
     "MINIMAL SCANDINAVIAN": [
@@ -60,6 +87,53 @@ ROOM_TYPES = [
 # Space Calculation
 MAX_ROOM_USAGE_PERCENT = 60
 MIN_WALKWAY_SPACE = 36
+MIN_WALKWAY_SPACE_CM = MIN_WALKWAY_SPACE * 2.54  # MIN_WALKWAY_SPACE is in inches
+# Also require the layout planner to place all footprints (with walkways) inside the room rectangle
+ROOM_PACKING_ENABLED = os.getenv("ROOM_PACKING_ENABLED", "true").lower() == "true"
+
+# Furniture dimension estimate cache (empty path = memory only)
+DIMENSION_CACHE_PATH = os.getenv("DIMENSION_CACHE_PATH", "/tmp/dimension_cache.sqlite3")
+DIMENSION_CACHE_TTL_SECONDS = float(os.getenv("DIMENSION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+DIMENSION_CACHE_MEMORY_SIZE = int(os.getenv("DIMENSION_CACHE_MEMORY_SIZE", "1024"))
+
+# Offline dimension table consulted before the model (empty path disables)
+DIMENSION_TABLE_PATH = os.getenv(
+    "DIMENSION_TABLE_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "furniture_dimensions.json")
+)
+# Minimum difflib similarity (0-1) for a fuzzy subtype match
+DIMENSION_TABLE_MATCH_CUTOFF = float(os.getenv("DIMENSION_TABLE_MATCH_CUTOFF", "0.85"))
+
+# Max concurrent dimension estimates per bulk selection
+ESTIMATE_CONCURRENCY = int(os.getenv("ESTIMATE_CONCURRENCY", "5"))
+
+# Estimate bulk selections with one prompt per batch instead of one per item
+ESTIMATE_BATCH_MODE = os.getenv("ESTIMATE_BATCH_MODE", "true").lower() == "true"
+ESTIMATE_BATCH_SIZE = int(os.getenv("ESTIMATE_BATCH_SIZE", "20"))
+
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "2"))
+GENERATION_QUEUE_SIZE = int(os.getenv("GENERATION_QUEUE_SIZE", "100"))
+GENERATION_JOB_TTL_SECONDS = float(os.getenv("GENERATION_JOB_TTL_SECONDS", "3600"))
+
+IMAGE_DOWNLOAD_MAX_CONNECTIONS = int(os.getenv("IMAGE_DOWNLOAD_MAX_CONNECTIONS", "20"))
+IMAGE_DOWNLOAD_PER_HOST = int(os.getenv("IMAGE_DOWNLOAD_PER_HOST", "4"))
+IMAGE_ENCODE_WORKERS = int(os.getenv("IMAGE_ENCODE_WORKERS", "4"))
+
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "/tmp/image_cache")
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+IMAGE_CACHE_MEMORY_BYTES = int(os.getenv("IMAGE_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+IMAGE_CACHE_TTL_SECONDS = float(os.getenv("IMAGE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# How compositor inputs reach FAL: "upload" (FAL file store, once per image),
+# "url" (pass public source URLs through) or "data_url" (inline base64)
+FAL_INPUT_MODE = os.getenv("FAL_INPUT_MODE", "upload").lower()
+FAL_UPLOAD_TTL_SECONDS = float(os.getenv("FAL_UPLOAD_TTL_SECONDS", str(24 * 3600)))
+
+# Compositor input downscaling (long edge in px, JPEG quality) per image role
+IMAGE_ROOM_MAX_EDGE = int(os.getenv("IMAGE_ROOM_MAX_EDGE", "2048"))
+IMAGE_ROOM_JPEG_QUALITY = int(os.getenv("IMAGE_ROOM_JPEG_QUALITY", "88"))
+IMAGE_PRODUCT_MAX_EDGE = int(os.getenv("IMAGE_PRODUCT_MAX_EDGE", "1024"))
+IMAGE_PRODUCT_JPEG_QUALITY = int(os.getenv("IMAGE_PRODUCT_JPEG_QUALITY", "85"))
 
 # Image Generation
 DALLE_MODEL = "dall-e-3"
@@ -349,11 +349,46 @@ class UserSession:
         self.cubic_feet: Optional[float] = None   # Actually cubic cm (keeping name for compatibility)
         self.furniture_selections: List[Dict] = []
         self.furniture_total_sqft: float = 0.0    # Actually sq cm (keeping name for compatibility)
+        self.furniture_by_type: Dict[str, Dict[str, float]] = {}  # type -> {"count", "sqcm"}
         self.min_price: Optional[float] = None
         self.max_price: Optional[float] = None
         self.search_results: List[Any] = []
         self.generated_images: List[str] = []
         self.decorative_items: List[Dict] = []
+    
+    # Selections change only through these methods, which keep the
+    # running totals in step with the list
+    def add_furniture(self, item: Dict):
+        """Add a selection and update running totals"""
+        self.furniture_selections.append(item)
+        self._account(item, 1)
+    
+    def remove_furniture(self, index: int) -> Dict:
+        """Remove a selection by index and update running totals"""
+        item = self.furniture_selections.pop(index)
+        self._account(item, -1)
+        return item
+    
+    def clear_furniture(self) -> int:
+        """Remove all selections; returns how many were removed"""
+        count = len(self.furniture_selections)
+        self.furniture_selections = []
+        self.furniture_total_sqft = 0.0
+        self.furniture_by_type = {}
+        return count
+    
+    def _account(self, item: Dict, sign: int):
+        """Apply one selection to the running totals (sign +1 add, -1 remove)"""
+        sqcm = item.get("sqcm", 0) * sign
+        # Selections carry sqcm rounded to 2 places, so rounding keeps float drift out
+        self.furniture_total_sqft = round(self.furniture_total_sqft + sqcm, 2) if self.furniture_selections else 0.0
+        
+        furniture_type = item.get("type", "")
+        totals = self.furniture_by_type.setdefault(furniture_type, {"count": 0, "sqcm": 0.0})
+        totals["count"] += sign
+        totals["sqcm"] = round(totals["sqcm"] + sqcm, 2)
+        if totals["count"] <= 0:
+            del self.furniture_by_type[furniture_type]
 
 
 # ==================== REQUESTS ====================
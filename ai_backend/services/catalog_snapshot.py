@@ -0,0 +1,104 @@
+"""
+Catalog Snapshot
+================
+Persist the loaded product catalog for fast cold starts
+"""
+
+import os
+import json
+import shutil
+import logging
+import tempfile
+from typing import Dict, List, Optional
+from ai_backend.services.product_store import ColumnarProductStore
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the snapshot layout changes
+SNAPSHOT_VERSION = 3
+
+
+def save_snapshot(
+    path: str,
+    meta: Dict,
+    products: Optional[List[Dict]] = None,
+    store: Optional[ColumnarProductStore] = None
+):
+    """
+    Atomically write a catalog snapshot directory
+    
+    Layout:
+        <path>/meta.json        version, source and freshness info
+        <path>/products.json    product dicts (list mode), or
+        <path>/*.npy            columnar store columns + manifest.json
+    
+    Only data is written (JSON and .npy without pickled objects), so
+    loading a snapshot never runs code from it.
+    
+    Args:
+        path: Snapshot directory
+        meta: Identity/freshness info (api_url, etag, ...)
+        products: Raw products to save in list mode
+        store: Columnar store to save in columnar mode
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    
+    # Write next to the target and rename, so readers never see a partial snapshot
+    temp_dir = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+    old_path = f"{temp_dir}.old"
+    try:
+        if store is not None:
+            store.save(temp_dir)
+        else:
+            with open(os.path.join(temp_dir, "products.json"), "w") as f:
+                json.dump(products or [], f)
+        
+        with open(os.path.join(temp_dir, "meta.json"), "w") as f:
+            json.dump({**meta, "version": SNAPSHOT_VERSION}, f)
+        
+        # A directory can't be renamed over a non-empty one: move the old one aside first
+        if os.path.lexists(path):
+            os.rename(path, old_path)
+        os.rename(temp_dir, path)
+    finally:
+        for leftover in (temp_dir, old_path):
+            if os.path.isdir(leftover) and not os.path.islink(leftover):
+                shutil.rmtree(leftover, ignore_errors=True)
+            elif os.path.lexists(leftover):
+                os.remove(leftover)
+    
+    size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+    logger.info(f"💾 Catalog snapshot saved: {path} ({size / 1e6:.1f} MB)")
+
+
+def load_snapshot(path: str) -> Optional[Dict]:
+    """
+    Read a catalog snapshot
+    
+    Returns:
+        Dict with 'meta' and either 'products' or 'store', or None if
+        missing, unreadable or written by a different snapshot version
+    """
+    if not path or not os.path.isfile(os.path.join(path, "meta.json")):
+        return None
+    
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        
+        if meta.get("version") != SNAPSHOT_VERSION:
+            logger.warning(f"⚠️ Ignoring catalog snapshot with version {meta.get('version')}")
+            return None
+        
+        products_path = os.path.join(path, "products.json")
+        if os.path.isfile(products_path):
+            with open(products_path) as f:
+                return {"meta": meta, "products": json.load(f)}
+        
+        # Copied into memory: the next save replaces these files
+        return {"meta": meta, "store": ColumnarProductStore.load(path, mmap=False)}
+    
+    except (OSError, ValueError, KeyError, AttributeError) as e:
+        logger.warning(f"⚠️ Ignoring unreadable catalog snapshot {path}: {e}")
+        return None
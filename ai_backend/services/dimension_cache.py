@@ -0,0 +1,136 @@
+"""
+Dimension Cache
+===============
+Two-tier cache (in-memory LRU + SQLite) for furniture dimension estimates
+"""
+
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from ai_backend.config import (
+    DIMENSION_CACHE_PATH,
+    DIMENSION_CACHE_TTL_SECONDS,
+    DIMENSION_CACHE_MEMORY_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+# Room area per size bucket (10 m² in sq cm); rooms beyond the last bucket share it
+ROOM_BUCKET_SQCM = 100_000
+MAX_ROOM_BUCKET = 10
+
+
+class DimensionCache:
+    """Caches dimension estimates by normalized type, subtype and room-size bucket"""
+    
+    def __init__(self, path: Optional[str], ttl_seconds: float, memory_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        
+        self._db = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS dimensions ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Dimension cache disk tier disabled ({path}): {e}")
+                self._db = None
+    
+    @staticmethod
+    def make_key(furniture_type: str, subtype: str, room_sqcm: float) -> str:
+        """Cache key from normalized type/subtype and room-size bucket"""
+        bucket = min(int((room_sqcm or 0) // ROOM_BUCKET_SQCM), MAX_ROOM_BUCKET)
+        return f"{_normalize(furniture_type)}|{_normalize(subtype)}|{bucket}"
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Get a cached estimate (a copy), or None on miss/expiry"""
+        now = time.time()
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[1] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                return dict(entry[0])
+            
+            if entry:
+                del self._memory[key]
+            
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM dimensions WHERE key = ?", (key,)
+                ).fetchone()
+                
+                if row and now - row[1] < self.ttl_seconds:
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.hits["disk"] += 1
+                    return dict(value)
+                
+                if row:
+                    self._db.execute("DELETE FROM dimensions WHERE key = ?", (key,))
+                    self._db.commit()
+            
+            self.misses += 1
+            return None
+    
+    def set(self, key: str, value: Dict):
+        """Store an estimate in both tiers"""
+        now = time.time()
+        
+        with self._lock:
+            self._remember(key, dict(value), now)
+            
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO dimensions (key, value, created_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value), now)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Could not persist dimension estimate: {e}")
+    
+    def _remember(self, key: str, value: Dict, created_at: float):
+        """Insert into the memory tier, evicting least recently used entries"""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters"""
+        lookups = self.hits["memory"] + self.hits["disk"] + self.misses
+        return {
+            "memory_hits": self.hits["memory"],
+            "disk_hits": self.hits["disk"],
+            "misses": self.misses,
+            "hit_rate": round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory)
+        }
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+# Global instance
+dimension_cache = DimensionCache(
+    DIMENSION_CACHE_PATH,
+    DIMENSION_CACHE_TTL_SECONDS,
+    DIMENSION_CACHE_MEMORY_SIZE
+)
@@ -0,0 +1,137 @@
+"""
+Dimension Parser
+================
+Extract furniture dimensions from catalog text (names, size fields)
+"""
+
+import re
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Product fields searched for sizes, most reliable first
+DIMENSION_FIELDS = ("dimensions", "productName")
+
+# Centimeters per unit
+UNITS = {"cm": 1.0, "mm": 0.1, "in": 2.54, "inch": 2.54, "inches": 2.54, '"': 2.54, "''": 2.54, "”": 2.54}
+
+_NUM = r"\d+(?:[.,]\d{1,2})?"
+_UNIT = r"(?:cm|mm|inches|inch|in(?![a-z])|\"|''|”)"
+_LABEL = r"(?:width|depth|height|length|[wdhl])"
+
+
+def _item_pattern(named: bool) -> str:
+    """One measurement: optional leading label, number, optional unit, optional trailing label"""
+    group = (lambda name: f"?P<{name}>") if named else (lambda name: "?:")
+    return (
+        rf"(?:(?<![a-z])({group('pre')}{_LABEL})\s*[:.]?\s*)?({group('num')}{_NUM})\s*({group('unit')}{_UNIT})?"
+        rf"(?:\s*(?<![a-z])({group('post')}[wdhl])(?![a-z]))?"
+    )
+
+
+ITEM_RE = re.compile(_item_pattern(named=True))
+
+# Two or three measurements joined by x, e.g. "W200 x D90 x H80 cm", '80" W x 40" D'
+RUN_RE = re.compile(rf"{_item_pattern(named=False)}(?:\s*[x×*]\s*{_item_pattern(named=False)}){{1,2}}")
+
+# Labeled measurement with a unit, e.g. "Width: 200 cm, Depth 90cm"
+LABELED_RE = re.compile(rf"(?<![a-z])(?P<pre>{_LABEL})\s*[:.]?\s*(?P<num>{_NUM})\s*(?P<unit>{_UNIT})")
+
+# Plausible ranges in cm
+MAX_FOOTPRINT_CM = 600
+MIN_FOOTPRINT_CM = 5
+MAX_HEIGHT_CM = 300
+
+FIELD_BY_LABEL = {"w": "width", "width": "width", "d": "depth", "depth": "depth", "h": "height", "height": "height"}
+
+
+def parse_dimensions(text: str) -> Optional[Dict[str, Optional[float]]]:
+    """
+    Parse a width x depth (x height) size from free text
+    
+    Unlabeled values are read in retail order (W x D x H). A unit is
+    required somewhere in the match, so "2 x 3 pack" is not a size.
+    
+    Returns:
+        {"width_cm", "depth_cm", "height_cm"} (height may be None),
+        or None if no plausible size is found
+    """
+    if not text:
+        return None
+    
+    text = text.lower()
+    
+    for run in RUN_RE.finditer(text):
+        result = _assign(ITEM_RE.finditer(run.group(0)))
+        if result:
+            return result
+    
+    return _assign(LABELED_RE.finditer(text))
+
+
+def _assign(matches: Iterable[re.Match]) -> Optional[Dict[str, Optional[float]]]:
+    """Map measurement matches to width/depth/height in cm"""
+    items: List[Tuple[Optional[str], float]] = []
+    unit = None
+    
+    for match in matches:
+        label = match.group("pre") or match.groupdict().get("post")
+        items.append((label, float(match.group("num").replace(",", "."))))
+        unit = unit or match.group("unit")
+    
+    if len(items) < 2 or unit is None:
+        return None
+    
+    factor = UNITS[unit]
+    values: Dict[str, float] = {}
+    unlabeled = []
+    
+    for label, value in items:
+        field = FIELD_BY_LABEL.get(label)
+        if label in ("l", "length"):
+            field = "width" if "width" not in values else "depth"
+        if field and field not in values:
+            values[field] = value * factor
+        else:
+            unlabeled.append(value * factor)
+    
+    for field in ("width", "depth", "height"):
+        if field not in values and unlabeled:
+            values[field] = unlabeled.pop(0)
+    
+    width, depth, height = values.get("width"), values.get("depth"), values.get("height")
+    if width is None or depth is None:
+        return None
+    if not (MIN_FOOTPRINT_CM <= width <= MAX_FOOTPRINT_CM and MIN_FOOTPRINT_CM <= depth <= MAX_FOOTPRINT_CM):
+        return None
+    if height is not None and not 0 < height <= MAX_HEIGHT_CM:
+        height = None
+    
+    return {"width_cm": width, "depth_cm": depth, "height_cm": height}
+
+
+def product_dimensions(product: Dict) -> Optional[Dict[str, Optional[float]]]:
+    """Parse the first size found in a product's dimension fields"""
+    for field in DIMENSION_FIELDS:
+        value = product.get(field)
+        if isinstance(value, str):
+            parsed = parse_dimensions(value)
+            if parsed:
+                return parsed
+    return None
+
+
+def median_footprint(samples: List[Dict[str, Optional[float]]]) -> Dict:
+    """Median dimensions of parsed samples, in the SpaceCalculator result shape"""
+    width = median(s["width_cm"] for s in samples)
+    depth = median(s["depth_cm"] for s in samples)
+    heights = [s["height_cm"] for s in samples if s["height_cm"] is not None]
+    height = median(heights) if heights else None
+    
+    return {
+        "width_cm": round(width, 2),
+        "depth_cm": round(depth, 2),
+        "height_cm": round(height, 2) if height is not None else None,
+        "notes": f"Median of {len(samples)} catalog products",
+        "sqcm": round(width * depth, 2),
+        "samples": len(samples)
+    }
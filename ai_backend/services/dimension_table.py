@@ -0,0 +1,139 @@
+"""
+Dimension Table
+===============
+Offline furniture dimensions with fuzzy type/subtype matching
+"""
+
+import re
+import json
+import difflib
+import logging
+from typing import Dict, List, Optional
+from ai_backend.config import DIMENSION_TABLE_PATH, DIMENSION_TABLE_MATCH_CUTOFF
+
+logger = logging.getLogger(__name__)
+
+# Max remembered lookups (subtypes are free text from requests)
+MEMO_SIZE = 4096
+# Closest names checked for a fuzzy match with the same numbers
+MATCH_CANDIDATES = 5
+
+
+class DimensionTable:
+    """
+    Canonical furniture sizes keyed by subtype (plus aliases)
+    
+    Data file format:
+        {"entries": [{"type": "Sofas", "subtype": "3-Seater Sofa", "aliases": [...],
+                      "width_cm": 213, "depth_cm": 97, "height_cm": 91, "notes": "..."}]}
+    """
+    
+    def __init__(self, entries: List[Dict], cutoff: float = DIMENSION_TABLE_MATCH_CUTOFF):
+        self.cutoff = cutoff
+        self._by_name: Dict[str, List[Dict]] = {}
+        self._memo: Dict[tuple, Optional[Dict]] = {}
+        
+        for entry in entries:
+            try:
+                dimensions = self._dimensions(entry)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"⚠️ Skipping invalid dimension table entry {entry.get('subtype')}: {e}")
+                continue
+            
+            record = {"type": _normalize(entry.get("type", "")), "dimensions": dimensions}
+            for name in [entry["subtype"]] + list(entry.get("aliases", [])):
+                self._by_name.setdefault(_normalize(name), []).append(record)
+    
+    @classmethod
+    def load(cls, path: Optional[str]) -> "DimensionTable":
+        """Load a table from a JSON data file (empty table if missing/unreadable)"""
+        if not path:
+            return cls([])
+        
+        try:
+            with open(path) as f:
+                entries = json.load(f).get("entries", [])
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Dimension table unavailable ({path}): {e}")
+            return cls([])
+        
+        table = cls(entries)
+        logger.info(f"📏 Dimension table loaded: {len(table)} names from {path}")
+        return table
+    
+    def __len__(self) -> int:
+        return len(self._by_name)
+    
+    @staticmethod
+    def _dimensions(entry: Dict) -> Dict:
+        """Validated dimensions for a table entry, with floor area"""
+        width_cm = float(entry["width_cm"])
+        depth_cm = float(entry["depth_cm"])
+        height_cm = float(entry["height_cm"])
+        
+        if min(width_cm, depth_cm, height_cm) <= 0:
+            raise ValueError("dimensions must be positive")
+        
+        return {
+            "width_cm": round(width_cm, 2),
+            "depth_cm": round(depth_cm, 2),
+            "height_cm": round(height_cm, 2),
+            "notes": entry.get("notes", "Standard size"),
+            "sqcm": round(width_cm * depth_cm, 2)
+        }
+    
+    def lookup(self, furniture_type: str, subtype: str) -> Optional[Dict]:
+        """
+        Dimensions for the closest confident match, or None
+        
+        Tries the subtype alone, then the subtype qualified by its type
+        (e.g. "Queen" + "Beds" -> "queen bed").
+        """
+        key = (_normalize(furniture_type), _normalize(subtype))
+        if key not in self._memo:
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[key] = self._match(*key)
+        
+        record = self._memo[key]
+        return dict(record["dimensions"]) if record else None
+    
+    def _match(self, furniture_type: str, subtype: str) -> Optional[Dict]:
+        """Best record for normalized type/subtype"""
+        queries = [subtype]
+        if furniture_type and furniture_type not in subtype:
+            queries.append(f"{subtype} {furniture_type}".strip())
+        
+        for query in queries:
+            if not query:
+                continue
+            
+            # Names differing only in a number ("4 seater" vs "5 seater") score
+            # high, so fuzzy matches must carry the same numbers
+            names = [query] if query in self._by_name else [
+                name for name in difflib.get_close_matches(
+                    query, self._by_name.keys(), n=MATCH_CANDIDATES, cutoff=self.cutoff
+                )
+                if _numbers(name) == _numbers(query)
+            ]
+            if names:
+                records = self._by_name[names[0]]
+                # Prefer the entry filed under the requested type
+                return next((r for r in records if r["type"] == furniture_type), records[0])
+        
+        return None
+
+
+def _numbers(text: str) -> List[str]:
+    """Numeric tokens of a normalized name, in order"""
+    return re.findall(r"\d+", text)
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, keep words only and drop plural 's' (Sofas -> sofa)"""
+    words = re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).split()
+    return " ".join(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words)
+
+
+# Global instance
+dimension_table = DimensionTable.load(DIMENSION_TABLE_PATH)
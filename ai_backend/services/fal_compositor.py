@@ -6,18 +6,41 @@ Uses FAL.ai SeeDream API for intelligent furniture placement
 
 import logging
 import os
-import requests
+import asyncio
+import httpx
 import tempfile
 import base64
 import io
-from PIL import Image
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from PIL import Image, ImageOps
+from typing import Dict, List, Optional, Tuple
 import fal_client
 from ai_backend.models import FurnitureItem
-from ai_backend.config import FAL_API_KEY
+from ai_backend.services.image_cache import image_cache
+from ai_backend.config import (
+    FAL_API_KEY,
+    FAL_INPUT_MODE,
+    IMAGE_DOWNLOAD_MAX_CONNECTIONS,
+    IMAGE_DOWNLOAD_PER_HOST,
+    IMAGE_ENCODE_WORKERS,
+    IMAGE_ROOM_MAX_EDGE,
+    IMAGE_ROOM_JPEG_QUALITY,
+    IMAGE_PRODUCT_MAX_EDGE,
+    IMAGE_PRODUCT_JPEG_QUALITY
+)
 
 logger = logging.getLogger(__name__)
 
+# FAL.ai input limit per side (px)
+FAL_MAX_EDGE = 4000
+
+# Input preprocessing per image role: (max long edge px, JPEG quality)
+IMAGE_PROFILES = {
+    "room": (min(IMAGE_ROOM_MAX_EDGE, FAL_MAX_EDGE), IMAGE_ROOM_JPEG_QUALITY),
+    "product": (min(IMAGE_PRODUCT_MAX_EDGE, FAL_MAX_EDGE), IMAGE_PRODUCT_JPEG_QUALITY)
+}
+
 
 class FALCompositor:
     """AI-powered furniture composition using FAL.ai SeeDream"""
@@ -30,15 +53,36 @@ class FALCompositor:
         os.environ["FAL_KEY"] = FAL_API_KEY
         fal_client.api_key = FAL_API_KEY
         
+        # Pooled downloads, a few at a time per host; Pillow work off the event loop
+        self._http = httpx.AsyncClient(
+            timeout=30.0,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=IMAGE_DOWNLOAD_MAX_CONNECTIONS,
+                max_keepalive_connections=IMAGE_DOWNLOAD_MAX_CONNECTIONS
+            )
+        )
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._encode_pool = ThreadPoolExecutor(max_workers=IMAGE_ENCODE_WORKERS, thread_name_prefix="image-encode")
+        
+        # In-flight FAL uploads by content hash
+        self._uploads: Dict[str, asyncio.Task] = {}
+        
         logger.info("✅ FAL.ai SeeDream compositor initialized")
     
-    def compose_furniture_in_room(
+    async def close(self):
+        """Close the download client and encode pool"""
+        await self._http.aclose()
+        self._encode_pool.shutdown(wait=False)
+    
+    async def compose_furniture_in_room(
         self,
         room_image_url: str,
         furniture_items: List[FurnitureItem],
         placement_prompt: str,
         room_type: str,
-        theme: str
+        theme: str,
+        layout_summary: Optional[str] = None
     ) -> str:
         """
         Compose furniture into room using FAL.ai SeeDream
@@ -49,6 +93,7 @@ class FALCompositor:
             placement_prompt: User's placement instructions
             room_type: Type of room
             theme: Design theme
+            layout_summary: Planned placement, one item per line
         
         Returns:
             Path to generated image file
@@ -60,33 +105,33 @@ class FALCompositor:
         logger.info(f"   Placement: {placement_prompt}")
         
         try:
-            # Step 1: Download room image
-            room_image_base64 = self._download_and_encode_image(room_image_url)
-            
-            # Step 2: Download all furniture images
-            furniture_images = []
+            # Step 1-2: Prepare room image and all furniture images concurrently
             for idx, item in enumerate(furniture_items, 1):
                 logger.info(f"   📥 [{idx}] {item.name} - ${item.price:.0f}")
-                furniture_base64 = self._download_and_encode_image(item.image_url)
-                furniture_images.append(furniture_base64)
+            
+            room_image_input, *furniture_images = await asyncio.gather(
+                self._prepare_input(room_image_url, "room"),
+                *[self._prepare_input(item.image_url, "product") for item in furniture_items]
+            )
             
             # Step 3: Create comprehensive prompt for FAL.ai
             ai_prompt = self._create_composition_prompt(
                 furniture_items,
                 placement_prompt,
                 room_type,
-                theme
+                theme,
+                layout_summary
             )
             
             logger.info(f"🤖 AI Prompt: {ai_prompt[:150]}...")
             
             # Step 4: Combine images (room + all furniture)
-            all_images = [room_image_base64] + furniture_images
+            all_images = [room_image_input] + furniture_images
             
             # Step 5: Call FAL.ai SeeDream API
             logger.info(f"🚀 Calling FAL.ai SeeDream with {len(all_images)} images...")
             
-            handler = fal_client.submit(
+            handler = await fal_client.submit_async(
                 "fal-ai/bytedance/seedream/v4/edit",
                 arguments={
                     "prompt": ai_prompt,
@@ -99,7 +144,7 @@ class FALCompositor:
             )
             
             # Get result
-            result = handler.get()
+            result = await handler.get()
             
             if not result or "images" not in result or not result["images"]:
                 raise Exception("FAL.ai did not return any images")
@@ -109,7 +154,7 @@ class FALCompositor:
             logger.info(f"✅ FAL.ai generated image: {generated_url[:50]}...")
             
             # Save to temp file
-            output_path = self._download_result_image(generated_url)
+            output_path = await self._download_result_image(generated_url)
             
             logger.info(f"💾 Saved: {output_path}")
             
@@ -119,61 +164,153 @@ class FALCompositor:
             logger.error(f"❌ FAL.ai composition failed: {e}")
             raise Exception(f"AI composition failed: {str(e)}")
     
-    def _download_and_encode_image(self, image_url: str) -> str:
-        """Download image from URL and encode to base64 data URL"""
-        try:
-            response = requests.get(image_url, timeout=30)
+    async def _fetch(self, url: str) -> bytes:
+        """GET url over the shared client, limited per host"""
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(IMAGE_DOWNLOAD_PER_HOST)
+        
+        async with limit:
+            response = await self._http.get(url)
             response.raise_for_status()
+            return response.content
+    
+    async def _prepare_input(self, image_url: str, profile: str) -> str:
+        """
+        Image reference for FAL, per FAL_INPUT_MODE
+        
+        "url" passes http(s) URLs through; "upload" sends each distinct
+        image to the FAL file store once and reuses its URL; anything else
+        (or a failed upload) inlines a base64 data URL. Uploaded and
+        inlined images are downscaled per IMAGE_PROFILES[profile].
+        """
+        if FAL_INPUT_MODE == "url" and image_url.startswith(("http://", "https://")):
+            return image_url
+        
+        image_bytes, content_type, digest = await self._load_image(image_url, profile)
+        
+        if FAL_INPUT_MODE == "upload":
+            try:
+                return await self._upload(digest, image_bytes, content_type)
+            except Exception as e:
+                logger.warning(f"⚠️ FAL upload failed, sending image inline: {e}")
+        
+        # Encode to base64
+        image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+        
+        return f"data:{content_type};base64,{image_base64}"
+    
+    async def _load_image(self, image_url: str, profile: str) -> Tuple[bytes, str, str]:
+        """Normalized image (bytes, content type, content hash), from the image cache or downloaded"""
+        max_edge, quality = IMAGE_PROFILES[profile]
+        # Settings are part of the key so changing a profile re-normalizes
+        cache_key = f"{image_url}#{max_edge}q{quality}"
+        
+        try:
+            loop = asyncio.get_running_loop()
             
-            image_bytes = response.content
-            
-            # Resize if too large (FAL.ai limit: 4000x4000)
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            if image.width > 4000 or image.height > 4000:
-                logger.info(f"   Resizing image from {image.size}")
-                
-                # Calculate new size maintaining aspect ratio
-                max_dim = 4000
-                if image.width > image.height:
-                    new_width = max_dim
-                    new_height = int((image.height * max_dim) / image.width)
-                else:
-                    new_height = max_dim
-                    new_width = int((image.width * max_dim) / image.height)
-                
-                image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                
-                # Convert back to bytes
-                output = io.BytesIO()
-                image.save(output, format='JPEG', quality=95)
-                image_bytes = output.getvalue()
-            
-            # Encode to base64
-            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-            
-            # Determine content type
-            content_type = "image/jpeg"
-            if image_url.endswith('.png'):
-                content_type = "image/png"
+            cached = await loop.run_in_executor(self._encode_pool, image_cache.get, cache_key)
+            if cached:
+                return cached
             
-            data_url = f"data:{content_type};base64,{image_base64}"
+            image_bytes = await self._fetch(image_url)
+            image_bytes, content_type = await loop.run_in_executor(
+                self._encode_pool, self._normalize_image, image_bytes, max_edge, quality
+            )
+            digest = await loop.run_in_executor(
+                self._encode_pool, image_cache.set, cache_key, image_bytes, content_type
+            )
             
-            return data_url
+            return image_bytes, content_type, digest
             
         except Exception as e:
             logger.error(f"Failed to download/encode image: {e}")
             raise
     
+    async def _upload(self, digest: str, image_bytes: bytes, content_type: str) -> str:
+        """FAL file store URL for an image, uploading it only if not already there"""
+        loop = asyncio.get_running_loop()
+        # SQLite lookup: off the event loop, like the image cache reads
+        url = await loop.run_in_executor(self._encode_pool, image_cache.get_upload, digest)
+        if url:
+            return url
+        
+        # Concurrent renders of the same image share one upload
+        task = self._uploads.get(digest)
+        if task is None:
+            task = asyncio.create_task(self._upload_once(digest, image_bytes, content_type))
+            self._uploads[digest] = task
+            task.add_done_callback(lambda t: self._forget_upload(digest, t))
+        
+        return await asyncio.shield(task)
+    
+    def _forget_upload(self, digest: str, task: asyncio.Task):
+        """Drop a finished in-flight upload (and mark its error as seen)"""
+        if self._uploads.get(digest) is task:
+            del self._uploads[digest]
+        if not task.cancelled():
+            task.exception()
+    
+    async def _upload_once(self, digest: str, image_bytes: bytes, content_type: str) -> str:
+        extension = "png" if content_type == "image/png" else "jpg"
+        url = await fal_client.upload_async(image_bytes, content_type, f"{digest[:16]}.{extension}")
+        await asyncio.get_running_loop().run_in_executor(
+            self._encode_pool, image_cache.set_upload, digest, url
+        )
+        logger.info(f"⬆️ Uploaded image {digest[:12]} to FAL storage ({len(image_bytes) / 1024:.0f} KB)")
+        return url
+    
+    def _normalize_image(self, image_bytes: bytes, max_edge: int, quality: int) -> Tuple[bytes, str]:
+        """
+        Downscale to max_edge and re-encode without metadata (runs in the encode pool)
+        
+        Returns:
+            (image bytes, content type): PNG when the image has
+            transparency (product cut-outs), JPEG otherwise
+        """
+        image = Image.open(io.BytesIO(image_bytes))
+        original_size = image.size
+        
+        # JPEG: let the decoder scale down by 1/2, 1/4 or 1/8 while decoding
+        if image.format == "JPEG" and max(image.size) > max_edge:
+            scale = max_edge / max(image.size)
+            image.draft("RGB", (int(image.width * scale), int(image.height * scale)))
+        
+        if max(image.size) > max_edge:
+            image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+            logger.info(f"   Resized image from {original_size} to {image.size}")
+        
+        # Apply EXIF rotation (on the smaller image) before the metadata is dropped
+        image = ImageOps.exif_transpose(image)
+        
+        # Re-encode; no exif/icc/info is passed, so metadata is stripped
+        output = io.BytesIO()
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        if has_alpha:
+            image.convert("RGBA").save(output, format='PNG')
+            content_type = "image/png"
+        else:
+            image.convert("RGB").save(output, format='JPEG', quality=quality)
+            content_type = "image/jpeg"
+        
+        return output.getvalue(), content_type
+    
     def _create_composition_prompt(
         self,
         furniture_items: List[FurnitureItem],
         placement_prompt: str,
         room_type: str,
-        theme: str
+        theme: str,
+        layout_summary: Optional[str] = None
     ) -> str:
         """Create detailed prompt for AI composition"""
         
+        # Planned positions, as seen from the camera (back wall = far wall)
+        layout_section = ""
+        if layout_summary:
+            layout_section = f"\nLayout plan (the back wall is the wall facing the camera):\n{layout_summary}\n"
+        
         # List furniture items
         furniture_list = ", ".join([
             f"{item.name} (${item.price:.0f})"
@@ -185,7 +322,7 @@ class FALCompositor:
 Furniture to place: {furniture_list}
 
 User instructions: {placement_prompt}
-
+{layout_section}
 Requirements:
 - Place furniture realistically on the floor, not floating
 - Maintain proper perspective and scale
@@ -198,17 +335,16 @@ Create a photorealistic, professionally designed interior."""
         
         return prompt
     
-    def _download_result_image(self, image_url: str) -> str:
+    async def _download_result_image(self, image_url: str) -> str:
         """Download final generated image and save to temp file"""
         try:
-            response = requests.get(image_url, timeout=30)
-            response.raise_for_status()
+            content = await self._fetch(image_url)
             
             # Save to temp file
             output_path = tempfile.NamedTemporaryFile(suffix=".png", delete=False).name
             
             with open(output_path, 'wb') as f:
-                f.write(response.content)
+                f.write(content)
             
             return output_path
             
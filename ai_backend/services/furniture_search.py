@@ -7,7 +7,7 @@ Search and match furniture from product database
 import logging
 from typing import List, Dict
 from ai_backend.models import FurnitureItem
-from ai_backend.services.product_service import ProductService
+from ai_backend.services.product_service import ProductService, extract_domain
 
 logger = logging.getLogger(__name__)
 
@@ -58,7 +58,7 @@ def search_furniture_from_database(
                 link=product.get("productLink", ""),
                 price=product.get("priceUSD", 0),
                 image_url=product.get("productImage", ""),
-                website=_extract_domain(product.get("websiteLink", "")),
+                website=product.get("websiteDomain") or extract_domain(product.get("websiteLink", "")),
                 type=furniture_type,
                 subtype=furniture_subtype
             )
@@ -69,13 +69,3 @@ def search_furniture_from_database(
     logger.info(f"\n✅ Total products found: {len(results)}")
     
     return results
-
-
-def _extract_domain(url: str) -> str:
-    """Extract clean domain from URL"""
-    if not url:
-        return ""
-    domain = url.replace("https://", "").replace("http://", "")
-    domain = domain.split("/")[0]
-    domain = domain.replace("www.", "")
-    return domain
\ No newline at end of file
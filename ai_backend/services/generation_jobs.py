@@ -0,0 +1,204 @@
+"""
+Generation Jobs
+===============
+Bounded background worker pool for room design generation
+"""
+
+import time
+import uuid
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from ai_backend.config import (
+    GENERATION_WORKERS,
+    GENERATION_QUEUE_SIZE,
+    GENERATION_JOB_TTL_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# A job body: receives a progress(stage) callback, returns the job result
+JobRunner = Callable[[Callable[[str], None]], Awaitable[Any]]
+
+
+class GenerationJob:
+    """State of one queued generation"""
+    
+    def __init__(self, session_id: str, run: JobRunner):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.status = QUEUED
+        self.stage: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.run = run
+        # Bumped on every update, so waiters can tell what they have seen
+        self.version = 0
+        self._changed = asyncio.Event()
+    
+    @property
+    def done(self) -> bool:
+        return self.status in (COMPLETED, FAILED)
+    
+    def update(self, **fields):
+        """Change state and wake anyone waiting for a change"""
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+    
+    async def wait_for_change(self, timeout: Optional[float] = None, since: Optional[int] = None) -> bool:
+        """
+        Wait until the job changes (False on timeout)
+        
+        Args:
+            since: Version the caller last saw; returns at once if the job
+                has changed since (default: wait for the next change)
+        """
+        if since is not None and self.version != since:
+            return True
+        
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "stage": self.stage,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class GenerationQueue:
+    """
+    Runs generation jobs on a fixed number of workers
+    
+    Submitting never blocks the event loop: jobs wait in a bounded queue
+    and at most `workers` run at a time. Finished jobs are kept for
+    `ttl_seconds` so clients can poll for the result.
+    """
+    
+    def __init__(self, workers: int, max_pending: int, ttl_seconds: float):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.jobs: Dict[str, GenerationJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    def start(self):
+        """Start the workers (idempotent; needs a running event loop)"""
+        if self._tasks:
+            return
+        
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.info(f"🧵 Generation queue started with {self.workers} workers")
+    
+    async def stop(self):
+        """Cancel the workers and fail jobs that never ran"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        
+        for job in self.jobs.values():
+            if not job.done:
+                job.update(status=FAILED, error="Server shutting down", finished_at=time.time())
+    
+    def submit(self, session_id: str, run: JobRunner) -> GenerationJob:
+        """
+        Queue a job
+        
+        Raises:
+            asyncio.QueueFull: Too many jobs are already waiting
+        """
+        self.start()
+        self._prune()
+        
+        job = GenerationJob(session_id, run)
+        self._queue.put_nowait(job)
+        self.jobs[job.id] = job
+        
+        logger.info(f"📥 Queued generation job {job.id} ({self._queue.qsize()} waiting)")
+        return job
+    
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        return self.jobs.get(job_id)
+    
+    def position(self, job: GenerationJob) -> int:
+        """Number of queued jobs ahead of job (0 once it runs)"""
+        if job.status != QUEUED:
+            return 0
+        return sum(1 for other in self.jobs.values() if other.status == QUEUED and other.created_at < job.created_at)
+    
+    async def wait(self, job: GenerationJob) -> GenerationJob:
+        """Wait until job finishes"""
+        while not job.done:
+            await job.wait_for_change()
+        return job
+    
+    async def _worker(self, number: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.done:
+                    continue
+                
+                job.update(status=RUNNING, started_at=time.time())
+                progress = lambda stage: job.update(stage=stage)
+                
+                try:
+                    result = await job.run(progress)
+                except asyncio.CancelledError:
+                    job.update(status=FAILED, error="Server shutting down", finished_at=time.time())
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Generation job {job.id} failed: {e}")
+                    job.update(status=FAILED, error=str(e), finished_at=time.time())
+                else:
+                    job.update(status=COMPLETED, result=result, finished_at=time.time())
+                    logger.info(f"✅ Generation job {job.id} done in {job.finished_at - job.started_at:.1f}s")
+            finally:
+                self._queue.task_done()
+    
+    def stats(self) -> Dict:
+        """Job counts by status"""
+        counts = {QUEUED: 0, RUNNING: 0, COMPLETED: 0, FAILED: 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {"workers": self.workers, **counts}
+    
+    def _prune(self):
+        """Forget finished jobs past their retention time"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job_id for job_id, job in self.jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+# Global instance
+generation_queue = GenerationQueue(
+    GENERATION_WORKERS,
+    GENERATION_QUEUE_SIZE,
+    GENERATION_JOB_TTL_SECONDS
+)
@@ -0,0 +1,288 @@
+"""
+Image Cache
+===========
+Content-addressed cache (in-memory LRU + disk LRU) for normalized input images
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from ai_backend.config import (
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_BYTES,
+    IMAGE_CACHE_MEMORY_BYTES,
+    IMAGE_CACHE_TTL_SECONDS,
+    FAL_UPLOAD_TTL_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Only refresh a blob's last-access time on disk this often (seconds)
+TOUCH_INTERVAL_SECONDS = 60
+# Max URL -> hash entries kept in memory
+MEMORY_URLS = 4096
+
+
+class ImageCache:
+    """
+    Caches normalized image bytes by URL, stored once per content hash
+    
+    The URL index maps each URL to the SHA-256 of its normalized bytes,
+    so the same picture behind several URLs is stored once. Blobs live in
+    files under `directory` and are evicted least recently used first
+    once they exceed `max_bytes`; a memory tier keeps the hottest blobs.
+    
+    It also remembers where each blob was uploaded (FAL file store), so
+    an image is uploaded once per content hash while that URL is valid.
+    """
+    
+    def __init__(
+        self,
+        directory: Optional[str],
+        max_bytes: int,
+        memory_bytes: int,
+        ttl_seconds: float,
+        upload_ttl_seconds: float
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.ttl_seconds = ttl_seconds
+        self.upload_ttl_seconds = upload_ttl_seconds
+        self._urls: "OrderedDict[str, tuple]" = OrderedDict()
+        self._uploads: "OrderedDict[str, tuple]" = OrderedDict()
+        self._blobs: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        # Bytes in the disk tier, kept in step with the blobs table so
+        # stats() and eviction don't have to sum it
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        
+        self._db = None
+        if directory:
+            try:
+                os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS urls ("
+                    "url TEXT PRIMARY KEY, digest TEXT NOT NULL, content_type TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS blobs ("
+                    "digest TEXT PRIMARY KEY, size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS blobs_accessed ON blobs (accessed_at)")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS uploads ("
+                    "digest TEXT PRIMARY KEY, url TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._db.commit()
+                self._disk_size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"⚠️ Image cache disk tier disabled ({directory}): {e}")
+                self._db = None
+    
+    def get(self, url: str) -> Optional[Tuple[bytes, str, str]]:
+        """Get (normalized bytes, content type, content hash) for url, or None on miss/expiry"""
+        now = time.time()
+        
+        with self._lock:
+            entry = self._urls.get(url)
+            if entry and now - entry[2] < self.ttl_seconds:
+                data = self._blobs.get(entry[0])
+                if data is not None:
+                    self._urls.move_to_end(url)
+                    self._blobs.move_to_end(entry[0])
+                    self.hits["memory"] += 1
+                    return data, entry[1], entry[0]
+            
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT u.digest, u.content_type, u.created_at, b.accessed_at "
+                    "FROM urls u JOIN blobs b ON b.digest = u.digest WHERE u.url = ?", (url,)
+                ).fetchone()
+                
+                if row and now - row[2] < self.ttl_seconds:
+                    digest, content_type, created_at, accessed_at = row
+                    data = self._read_blob(digest)
+                    if data is not None:
+                        if now - accessed_at > TOUCH_INTERVAL_SECONDS:
+                            self._db.execute("UPDATE blobs SET accessed_at = ? WHERE digest = ?", (now, digest))
+                            self._db.commit()
+                        self._remember(url, digest, content_type, created_at, data)
+                        self.hits["disk"] += 1
+                        return data, content_type, digest
+                
+                if row:
+                    self._db.execute("DELETE FROM urls WHERE url = ?", (url,))
+                    self._db.commit()
+            
+            self.misses += 1
+            return None
+    
+    def set(self, url: str, data: bytes, content_type: str) -> str:
+        """Store normalized bytes for url in both tiers; returns the content hash"""
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        
+        with self._lock:
+            self._remember(url, digest, content_type, now, data)
+            
+            if self._db is not None:
+                try:
+                    path = self._blob_path(digest)
+                    if not os.path.exists(path):
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                        with open(tmp_path, "wb") as f:
+                            f.write(data)
+                        os.replace(tmp_path, path)
+                    
+                    known = self._db.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO blobs (digest, size, accessed_at) VALUES (?, ?, ?)",
+                        (digest, len(data), now)
+                    )
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO urls (url, digest, content_type, created_at) VALUES (?, ?, ?, ?)",
+                        (url, digest, content_type, now)
+                    )
+                    self._db.commit()
+                    if not known:
+                        self._disk_size += len(data)
+                    self._evict()
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(f"⚠️ Could not persist cached image: {e}")
+        
+        return digest
+    
+    def get_upload(self, digest: str) -> Optional[str]:
+        """Remote URL a blob was uploaded to, or None if unknown/expired"""
+        now = time.time()
+        
+        with self._lock:
+            entry = self._uploads.get(digest)
+            if entry is None and self._db is not None:
+                entry = self._db.execute(
+                    "SELECT url, created_at FROM uploads WHERE digest = ?", (digest,)
+                ).fetchone()
+                if entry:
+                    self._remember_upload(digest, *entry)
+            
+            if entry and now - entry[1] < self.upload_ttl_seconds:
+                return entry[0]
+            return None
+    
+    def set_upload(self, digest: str, url: str):
+        """Record the remote URL of an uploaded blob"""
+        now = time.time()
+        
+        with self._lock:
+            self._remember_upload(digest, url, now)
+            
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO uploads (digest, url, created_at) VALUES (?, ?, ?)",
+                        (digest, url, now)
+                    )
+                    self._db.execute(
+                        "DELETE FROM uploads WHERE created_at < ?", (now - self.upload_ttl_seconds,)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Could not persist upload URL: {e}")
+    
+    def _remember_upload(self, digest: str, url: str, created_at: float):
+        self._uploads[digest] = (url, created_at)
+        self._uploads.move_to_end(digest)
+        while len(self._uploads) > MEMORY_URLS:
+            self._uploads.popitem(last=False)
+    
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", digest[:2], digest)
+    
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except OSError:
+            row = self._db.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self._db.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+            self._db.commit()
+            if row:
+                self._disk_size -= row[0]
+            return None
+    
+    def _remember(self, url: str, digest: str, content_type: str, created_at: float, data: bytes):
+        """Insert into the memory tier, evicting least recently used blobs past the byte budget"""
+        if len(data) > self.memory_bytes:
+            return
+        
+        self._urls[url] = (digest, content_type, created_at)
+        self._urls.move_to_end(url)
+        if digest not in self._blobs:
+            self._blobs[digest] = data
+            self._memory_size += len(data)
+        self._blobs.move_to_end(digest)
+        
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._blobs.popitem(last=False)
+            self._memory_size -= len(evicted)
+        
+        # URLs whose blob was evicted just miss the memory tier
+        while len(self._urls) > MEMORY_URLS:
+            self._urls.popitem(last=False)
+    
+    def _evict(self):
+        """Delete least recently used blobs until the disk tier fits max_bytes"""
+        total = self._disk_size
+        if total <= self.max_bytes:
+            return
+        
+        evicted = 0
+        for digest, size in self._db.execute("SELECT digest, size FROM blobs ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+            self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self._db.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+            total -= size
+            evicted += 1
+        
+        self._db.commit()
+        self._disk_size = total
+        logger.info(f"🧹 Image cache evicted {evicted} images")
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and sizes (counters only: cheap enough for the event loop)"""
+        lookups = self.hits["memory"] + self.hits["disk"] + self.misses
+        return {
+            "memory_hits": self.hits["memory"],
+            "disk_hits": self.hits["disk"],
+            "misses": self.misses,
+            "hit_rate": round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+            "memory_bytes": self._memory_size,
+            "disk_bytes": self._disk_size
+        }
+
+
+# Global instance
+image_cache = ImageCache(
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_BYTES,
+    IMAGE_CACHE_MEMORY_BYTES,
+    IMAGE_CACHE_TTL_SECONDS,
+    FAL_UPLOAD_TTL_SECONDS
+)
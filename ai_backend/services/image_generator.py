@@ -5,20 +5,21 @@ Generate room designs using FAL.ai SeeDream
 """
 
 import logging
-from typing import List
+from typing import List, Optional
 from ai_backend.models import FurnitureItem
 from ai_backend.services.fal_compositor import fal_compositor
 
 logger = logging.getLogger(__name__)
 
 
-def generate_room_design(
+async def generate_room_design(
     room_image_url: str,
     prompt: str,
     theme: str,
     room_type: str,
     furniture_items: List[FurnitureItem],
-    decorative_items: list = None
+    decorative_items: list = None,
+    layout_summary: Optional[str] = None
 ) -> str:
     """
     Generate room design using FAL.ai SeeDream
@@ -30,6 +31,7 @@ def generate_room_design(
         room_type: Type of room
         furniture_items: Selected furniture items
         decorative_items: Optional decorative items (not used with FAL.ai)
+        layout_summary: Planned placement from the layout planner
     
     Returns:
         Path to generated image file
@@ -46,12 +48,13 @@ def generate_room_design(
     
     try:
         # Use FAL.ai compositor
-        generated_path = fal_compositor.compose_furniture_in_room(
+        generated_path = await fal_compositor.compose_furniture_in_room(
             room_image_url=room_image_url,
             furniture_items=furniture_items,
             placement_prompt=prompt,
             room_type=room_type,
-            theme=theme
+            theme=theme,
+            layout_summary=layout_summary
         )
         
         logger.info(f"✅ Room design generated successfully with FAL.ai")
@@ -0,0 +1,496 @@
+"""
+Layout Planner
+==============
+Deterministic rule-based furniture layout for a rectangular room
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+from ai_backend.services.room_packer import RoomPacker
+
+logger = logging.getLogger(__name__)
+
+# Keyword rules, checked in order; first match decides an item's role. Keywords
+# match whole words (a trailing plural "s"/"es" allowed), so "mat" is not "mattress"
+ROLE_KEYWORDS = (
+    ("rug", ("rug", "carpet", "mat")),
+    ("nightstand", ("bedside", "nightstand", "night stand", "night table")),
+    ("sofa", ("sofa", "couch", "loveseat", "sectional", "settee", "chaise")),
+    ("bed", ("bed", "mattress", "daybed", "bunk")),
+    ("dining_table", ("dining table", "dining set", "kitchen table", "bistro", "outdoor dining")),
+    ("coffee_table", ("coffee table",)),
+    ("side_table", ("side table", "end table", "accent table")),
+    ("desk", ("desk",)),
+    ("dining_chair", ("dining chair", "bar stool", "counter stool")),
+    ("desk_chair", ("office chair", "desk chair", "gaming chair")),
+    ("storage", (
+        "wardrobe", "closet", "armoire", "bookshelf", "bookshelves", "bookcase", "shelf", "shelves",
+        "shelving", "sideboard", "buffet", "credenza", "dresser", "drawer", "cabinet", "tv", "media",
+        "console", "storage"
+    )),
+    ("seating", ("armchair", "chair", "lounger", "ottoman", "pouf", "stool", "bench")),
+    ("lighting", ("lamp", "light", "lighting")),
+)
+
+# Roles that can be a room's focal piece, by preference for each room type
+ANCHOR_ROLES = {
+    "Living Room Furniture": ("sofa", "dining_table", "bed", "desk"),
+    "Bedroom Furniture": ("bed", "sofa", "desk", "dining_table"),
+    "Guest Bedroom": ("bed", "sofa", "desk", "dining_table"),
+    "Kids Room Furniture": ("bed", "desk", "sofa", "dining_table"),
+    "Dining Room Furniture": ("dining_table", "sofa", "desk", "bed"),
+    "Kitchen": ("dining_table", "desk", "sofa", "bed"),
+    "Home Office Furniture": ("desk", "sofa", "dining_table", "bed"),
+    "Study Room": ("desk", "sofa", "bed", "dining_table"),
+    "Balcony Furniture": ("dining_table", "sofa", "seating", "bed"),
+}
+DEFAULT_ANCHOR_ROLES = ("bed", "sofa", "dining_table", "desk")
+
+# Companions kept next to their anchor and allowed inside its walkway
+COMPANION_ROLES = {
+    "bed": ("nightstand",),
+    "sofa": ("coffee_table", "side_table"),
+    "dining_table": ("dining_chair",),
+    "desk": ("desk_chair",),
+}
+
+# Anchor offsets from centered tried while pieces are left out, as a fraction
+# of the free margin on each side
+ANCHOR_SHIFTS = (0.0, 0.5, -0.5, 1.0, -1.0)
+
+# Gap between a sofa and its coffee table (cm)
+COFFEE_TABLE_GAP_CM = 45
+# Grid step when searching positions along walls (cm)
+SCAN_STEP_CM = 5
+# Items this low lie under other furniture
+FLOOR_COVERING_MAX_HEIGHT_CM = 3
+
+# Walls as seen from the camera: the back wall is y = 0, the left wall x = 0
+WALL_ROTATION = {"back": 0, "left": 90, "right": 270, "front": 180}
+
+# Side of the footprint the walkway is on, per rotation (room packer notation)
+ROTATION_WALKWAY_SIDE = {0: "+y", 180: "-y", 90: "+x", 270: "-x"}
+
+EPSILON = 1e-6
+
+
+class LayoutPlanner:
+    """
+    Places selected furniture in a length x width room
+    
+    Coordinates are in cm from the back-left corner: x along the room
+    length (left to right), y along the width (back wall to camera).
+    Rotation is the direction the item's front faces: 0 = toward the
+    camera, 90 = right, 180 = back wall, 270 = left.
+    """
+    
+    def __init__(self, room_length: float, room_width: float, room_type: Optional[str], clearance: float):
+        self.length = float(room_length)
+        self.width = float(room_width)
+        self.room_type = room_type
+        self.clearance = clearance
+        self.packer = RoomPacker(room_length, room_width, clearance)
+        self.placed: List[Dict] = []
+        self.unplaced: List[str] = []
+    
+    def plan(self, items: List[Dict]) -> Dict:
+        """
+        Lay out items
+        
+        Args:
+            items: Dicts with "width_cm", "depth_cm" (or "sqcm"), and
+                optionally "height_cm", "type", "subtype"
+        
+        Returns:
+            {"room", "placements", "unplaced", "summary"}
+        """
+        anchor = self._choose_anchor([self._piece(item, index) for index, item in enumerate(items)])
+        
+        # The anchor's preferred spot first; the others only while pieces are left out
+        best = None
+        for spot in self._anchor_spots(anchor) if anchor is not None else [None]:
+            self._arrange([self._piece(item, index) for index, item in enumerate(items)], anchor, spot)
+            if best is None or len(self.unplaced) < len(best[1]):
+                best = (self.placed, self.unplaced)
+            if not self.unplaced:
+                break
+        self.placed, self.unplaced = best
+        
+        placements = sorted(self.placed, key=lambda p: p["index"])
+        
+        return {
+            "room": {"length_cm": self.length, "width_cm": self.width, "type": self.room_type},
+            "placements": [self._public(p) for p in placements],
+            "unplaced": self.unplaced,
+            "summary": self._summary(placements)
+        }
+    
+    def _arrange(self, pieces: List[Dict], anchor: Optional[Dict], spot: Optional[Tuple]):
+        """One layout attempt with the anchor at spot; fills self.placed and self.unplaced"""
+        self.placed = []
+        self.unplaced = []
+        
+        if anchor is not None:
+            anchor = pieces[anchor["index"]]
+            self._place_anchor(anchor, spot)
+            for piece in pieces:
+                if piece is not anchor and piece["role"] in COMPANION_ROLES.get(anchor["role"], ()):
+                    self._place_companion(piece, anchor)
+        
+        # Remaining pieces: big storage first, then the rest, rugs last
+        # (pieces already tried by the anchor/companion fallbacks stay unplaced)
+        rest = [p for p in pieces if not p.get("placed") and not p.get("tried") and p["role"] != "rug"]
+        rest.sort(key=lambda p: (p["role"] != "storage", -p["width"] * p["depth"], p["index"]))
+        for piece in rest:
+            if not piece.get("placed"):
+                self._place_free(piece, anchor)
+        
+        for piece in pieces:
+            if piece["role"] == "rug":
+                self._place_rug(piece, anchor)
+    
+    # ----- classification -----
+    
+    @staticmethod
+    def _piece(item: Dict, index: int) -> Dict:
+        """Normalize an item into a piece with a role and footprint"""
+        width = float(item.get("width_cm") or 0)
+        depth = float(item.get("depth_cm") or 0)
+        if not (width and depth):
+            width = depth = float(item.get("sqcm") or 0) ** 0.5
+        
+        label = item.get("subtype") or item.get("type") or f"item {index + 1}"
+        
+        # The subtype is the specific name; the type ("Bedroom Furniture") only breaks ties
+        role = _role(item.get("subtype")) or _role(item.get("type")) or "other"
+        
+        height = item.get("height_cm")
+        if height is not None and height <= FLOOR_COVERING_MAX_HEIGHT_CM:
+            role = "rug"
+        
+        return {"index": index, "label": label, "role": role, "width": width, "depth": depth}
+    
+    def _choose_anchor(self, pieces: List[Dict]) -> Optional[Dict]:
+        """Focal piece for the room type (largest of the preferred role)"""
+        for role in ANCHOR_ROLES.get(self.room_type, DEFAULT_ANCHOR_ROLES):
+            candidates = [p for p in pieces if p["role"] == role]
+            if candidates:
+                return max(candidates, key=lambda p: (p["width"] * p["depth"], -p["index"]))
+        return None
+    
+    # ----- placement strategies -----
+    
+    def _anchor_spots(self, anchor: Dict) -> List[Tuple[float, float, str]]:
+        """
+        (x, y, description) spots for the anchor, preferred first
+        
+        Dining tables go in the middle, everything else centered on the
+        back wall; the later spots shift it off-center (toward the front
+        or back, or along the wall) to leave room for the other pieces.
+        """
+        if anchor["role"] == "dining_table":
+            x = (self.length - anchor["width"]) / 2
+            margin = (self.width - anchor["depth"]) / 2
+            return [
+                (x, margin * (1 + shift), "centered in the room (focal point)" if not shift else
+                 f"in the room, {margin * (1 + shift):.0f} cm from the back wall (focal point)")
+                for shift in ANCHOR_SHIFTS
+            ]
+        
+        margin = (self.length - anchor["width"]) / 2
+        return [
+            (margin * (1 + shift), 0, "centered against the back wall (focal point)" if not shift else
+             f"against the back wall, {margin * (1 + shift):.0f} cm from the left (focal point)")
+            for shift in ANCHOR_SHIFTS
+        ]
+    
+    def _place_anchor(self, anchor: Dict, spot: Tuple[float, float, str]):
+        """Place the anchor at spot (dining tables need no walkway of their own), else anywhere"""
+        x, y, description = spot
+        if self._try(anchor, x, y, 0, description, walkway=anchor["role"] != "dining_table"):
+            return
+        
+        self._place_free(anchor, None)
+    
+    def _place_companion(self, piece: Dict, anchor: Dict):
+        """Place a companion relative to its anchor, falling back to free placement"""
+        a = self._placement_of(anchor)
+        if a is None:
+            self._place_free(piece, None)
+            return
+        
+        role = piece["role"]
+        w, d = piece["width"], piece["depth"]
+        candidates = []
+        
+        if role in ("nightstand", "side_table"):
+            candidates = [
+                (a["x"] - w - SCAN_STEP_CM, a["y"], 0, f"left of {anchor['label']}"),
+                (a["x"] + a["lx"] + SCAN_STEP_CM, a["y"], 0, f"right of {anchor['label']}"),
+            ]
+        elif role == "coffee_table":
+            candidates = [(
+                a["x"] + (a["lx"] - w) / 2, a["y"] + a["wy"] + COFFEE_TABLE_GAP_CM, 0,
+                f"in front of {anchor['label']}"
+            )]
+        elif role == "desk_chair":
+            candidates = [(
+                a["x"] + (a["lx"] - w) / 2, a["y"] + a["wy"], 180,
+                f"at {anchor['label']}"
+            )]
+        elif role == "dining_chair":
+            candidates = self._chair_slots(piece, a, anchor["label"])
+        
+        for x, y, rotation, description in candidates:
+            if self._try(piece, x, y, rotation, description, walkway=False, inside=anchor["index"]):
+                return
+        
+        self._place_free(piece, anchor)
+    
+    def _chair_slots(self, chair: Dict, table: Dict, label: str) -> List[Tuple]:
+        """Chair positions around a table: long sides first, then the ends"""
+        w, d = chair["width"], chair["depth"]
+        slots = []
+        per_side = max(1, int(table["lx"] // (w + 10)))
+        for i in range(per_side):
+            x = table["x"] + (i + 0.5) * table["lx"] / per_side - w / 2
+            slots.append((x, table["y"] - d, 0, f"at the back side of {label}"))
+            slots.append((x, table["y"] + table["wy"], 180, f"at the front side of {label}"))
+        y = table["y"] + (table["wy"] - w) / 2
+        slots.append((table["x"] - d, y, 90, f"at the left end of {label}"))
+        slots.append((table["x"] + table["lx"], y, 270, f"at the right end of {label}"))
+        return slots
+    
+    def _place_free(self, piece: Dict, anchor: Optional[Dict]):
+        """Place along the walls (storage: side walls first; seating: near the anchor first)"""
+        piece["tried"] = True
+        
+        if piece["role"] in ("seating", "lighting", "side_table") and anchor is not None:
+            a = self._placement_of(anchor)
+            if a is not None:
+                w = piece["width"]
+                for x, description in (
+                    (a["x"] - w - 30, f"beside {anchor['label']} (left)"),
+                    (a["x"] + a["lx"] + 30, f"beside {anchor['label']} (right)"),
+                ):
+                    if self._try(piece, x, a["y"], 0, description):
+                        return
+        
+        if piece["role"] in ("lighting", "other", "side_table") and self._corners(piece):
+            return
+        
+        for wall in ("left", "right", "back", "front"):
+            if self._along_wall(piece, wall):
+                return
+        
+        if self._open_floor(piece):
+            return
+        
+        self.unplaced.append(piece["label"])
+    
+    def _corners(self, piece: Dict) -> bool:
+        """Try the four corners"""
+        w, d = piece["width"], piece["depth"]
+        for x, y, rotation, description in (
+            (0, 0, 0, "in the back-left corner"),
+            (self.length - w, 0, 0, "in the back-right corner"),
+            (0, self.width - w, 90, "in the front-left corner"),
+            (self.length - d, self.width - w, 270, "in the front-right corner"),
+        ):
+            if self._try(piece, x, y, rotation, description):
+                return True
+        return False
+    
+    def _along_wall(self, piece: Dict, wall: str) -> bool:
+        """First free spot along a wall, scanning from the back (or left) corner"""
+        rotation = WALL_ROTATION[wall]
+        lx, wy = self._extent(piece, rotation)
+        span = self.width if wall in ("left", "right") else self.length
+        run = wy if wall in ("left", "right") else lx
+        
+        offset = 0.0
+        while offset + run <= span + EPSILON:
+            if wall == "left":
+                x, y = 0.0, offset
+            elif wall == "right":
+                x, y = self.length - lx, offset
+            elif wall == "back":
+                x, y = offset, 0.0
+            else:
+                x, y = offset, self.width - wy
+            
+            description = f"against the {wall} wall, {offset:.0f} cm from the {'back' if wall in ('left', 'right') else 'left'}"
+            if self._try(piece, x, y, rotation, description):
+                return True
+            offset += SCAN_STEP_CM
+        return False
+    
+    def _open_floor(self, piece: Dict) -> bool:
+        """Lowest free spot anywhere on the floor (the room packer's search), any rotation"""
+        solids = [p["rect"] for p in self.placed if p["role"] != "rug"]
+        walkways = [p["zone"] for p in self.placed if p["role"] != "rug" and p["zone"] is not None]
+        
+        best = None
+        for rotation, side in ROTATION_WALKWAY_SIDE.items():
+            lx, wy = self._extent(piece, rotation)
+            spot = self.packer.lowest_spot(lx, wy, side, solids, walkways, best[0] if best else None)
+            if spot is None:
+                continue
+            rect, zone = spot
+            key = (rect[1], rect[0])
+            if best is None or key < best[0]:
+                best = (key, rect, zone, rotation)
+        
+        if best is None:
+            return False
+        
+        _, rect, zone, rotation = best
+        description = f"in the open floor, {rect[0]:.0f} cm from the left wall and {rect[1]:.0f} cm from the back wall"
+        self._record(piece, rect[0], rect[1], rotation, description, zone)
+        return True
+    
+    def _place_rug(self, piece: Dict, anchor: Optional[Dict]):
+        """Center rugs under the anchor (or the room); they may overlap furniture"""
+        a = self._placement_of(anchor) if anchor else None
+        cx = a["x"] + a["lx"] / 2 if a else self.length / 2
+        cy = a["y"] + a["wy"] / 2 + (a["wy"] / 4 if anchor and anchor["role"] == "bed" else 0) if a else self.width / 2
+        
+        for rotation in (0, 90):
+            lx, wy = self._extent(piece, rotation)
+            x = min(max(cx - lx / 2, 0), self.length - lx)
+            y = min(max(cy - wy / 2, 0), self.width - wy)
+            if x >= -EPSILON and y >= -EPSILON:
+                description = f"under {anchor['label']}" if anchor else "centered in the room"
+                self._record(piece, x, y, rotation, description, zone=None)
+                return
+        
+        self.unplaced.append(piece["label"])
+    
+    # ----- geometry -----
+    
+    @staticmethod
+    def _extent(piece: Dict, rotation: int) -> Tuple[float, float]:
+        """(x extent, y extent) of a piece at a rotation"""
+        if rotation in (90, 270):
+            return piece["depth"], piece["width"]
+        return piece["width"], piece["depth"]
+    
+    def _zone(self, x: float, y: float, lx: float, wy: float, rotation: int) -> Tuple[float, float, float, float]:
+        """Walkway rectangle in front of an item"""
+        c = self.clearance
+        if rotation == 0:
+            return (x, y + wy, lx, c)
+        if rotation == 180:
+            return (x, y - c, lx, c)
+        if rotation == 90:
+            return (x + lx, y, c, wy)
+        return (x - c, y, c, wy)
+    
+    def _inside(self, rect: Tuple[float, float, float, float]) -> bool:
+        x, y, lx, wy = rect
+        return x >= -EPSILON and y >= -EPSILON and x + lx <= self.length + EPSILON and y + wy <= self.width + EPSILON
+    
+    def _try(
+        self,
+        piece: Dict,
+        x: float,
+        y: float,
+        rotation: int,
+        description: str,
+        walkway: bool = True,
+        inside: Optional[int] = None
+    ) -> bool:
+        """
+        Place piece if the spot is free
+        
+        Args:
+            walkway: The piece needs its own walkway in front
+            inside: Index of the anchor whose walkway the piece may occupy
+        """
+        lx, wy = self._extent(piece, rotation)
+        rect = (x, y, lx, wy)
+        if not self._inside(rect):
+            return False
+        
+        zone = self._zone(x, y, lx, wy, rotation) if walkway else None
+        if zone is not None and not self._inside(zone):
+            return False
+        
+        for other in self.placed:
+            if other["role"] == "rug":
+                continue
+            if _overlaps(rect, other["rect"]):
+                return False
+            if other["zone"] is not None and other["index"] != inside and _overlaps(rect, other["zone"]):
+                return False
+            if zone is not None and _overlaps(zone, other["rect"]):
+                return False
+        
+        self._record(piece, x, y, rotation, description, zone)
+        return True
+    
+    def _record(self, piece: Dict, x: float, y: float, rotation: int, description: str, zone):
+        lx, wy = self._extent(piece, rotation)
+        x, y = float(x), float(y)
+        piece["placed"] = True
+        self.placed.append({
+            "index": piece["index"],
+            "label": piece["label"],
+            "role": piece["role"],
+            "rotation": rotation,
+            "rect": (x, y, lx, wy),
+            "zone": zone,
+            "x": x, "y": y, "lx": lx, "wy": wy,
+            "description": description
+        })
+    
+    def _placement_of(self, piece: Optional[Dict]) -> Optional[Dict]:
+        if piece is None:
+            return None
+        return next((p for p in self.placed if p["index"] == piece["index"]), None)
+    
+    # ----- output -----
+    
+    @staticmethod
+    def _public(placement: Dict) -> Dict:
+        return {
+            "item": placement["label"],
+            "role": placement["role"],
+            "x_cm": round(placement["x"], 1),
+            "y_cm": round(placement["y"], 1),
+            "length_cm": round(placement["lx"], 1),
+            "width_cm": round(placement["wy"], 1),
+            "rotation": placement["rotation"],
+            "position": placement["description"]
+        }
+    
+    def _summary(self, placements: List[Dict]) -> str:
+        """Plain-text layout, usable as placement instructions"""
+        lines = [f"{p['label']}: {p['description']}" for p in placements]
+        if placements:
+            lines.append(f"Keep at least {self.clearance:.0f} cm of walkway in front of each piece.")
+        if self.unplaced:
+            lines.append(f"No room for: {', '.join(self.unplaced)}.")
+        return "\n".join(lines)
+
+
+def _role(name: Optional[str]) -> Optional[str]:
+    """Role of the first ROLE_KEYWORDS rule with a keyword among name's words"""
+    words = re.findall(r"[a-z0-9]+", (name or "").lower())
+    for role, keywords in ROLE_KEYWORDS:
+        for keyword in keywords:
+            *head, last = keyword.split()
+            n = len(head)
+            for i in range(len(words) - n):
+                if words[i:i + n] == head and words[i + n] in (last, last + "s", last + "es"):
+                    return role
+    return None
+
+
+def _overlaps(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
+    """Whether two (x, y, length, width) rectangles overlap with positive area"""
+    return (
+        a[0] < b[0] + b[2] - EPSILON and b[0] < a[0] + a[2] - EPSILON
+        and a[1] < b[1] + b[3] - EPSILON and b[1] < a[1] + a[3] - EPSILON
+    )
@@ -5,51 +5,689 @@ Handles product database operations with intelligent filtering
 """
 
 import httpx
+import ijson
+import asyncio
 import logging
-from typing import List, Dict, Optional
-from collections import defaultdict
+import math
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Optional, Set, Tuple
+from collections import Counter, defaultdict
+from functools import lru_cache
+import numpy as np
+from ai_backend.config import (
+    THEMES,
+    PRODUCT_STORE_COLUMNAR,
+    PRODUCT_API_UPDATED_SINCE_PARAM,
+    PRODUCT_SNAPSHOT_PATH,
+    PRODUCT_API_STREAMING,
+    PRODUCT_API_PAGE_SIZE,
+    PRODUCT_API_PAGE_PARAM,
+    PRODUCT_API_LIMIT_PARAM,
+    PRODUCT_API_FETCH_CONCURRENCY,
+    PRODUCT_API_PAGE_RETRIES,
+    PRODUCT_SHARED_CATALOG_DIR,
+    PRODUCT_FOOTPRINT_MIN_SAMPLES
+)
+from ai_backend.services.product_store import ColumnarProductStore, MISSING, STORED_FIELDS
+from ai_backend.services.catalog_snapshot import save_snapshot, load_snapshot
+from ai_backend.services.shared_catalog import SharedCatalog
+from ai_backend.services.dimension_parser import DIMENSION_FIELDS, product_dimensions, median_footprint
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def extract_domain(url: str) -> str:
+    """Extract clean domain from URL (memoized, website links repeat heavily)"""
+    if not url:
+        return ""
+    
+    # Remove protocol
+    domain = url.replace("https://", "").replace("http://", "")
+    
+    # Remove path
+    domain = domain.split("/")[0]
+    
+    # Remove www.
+    domain = domain.replace("www.", "")
+    
+    return domain
+
+
+# Fields kept from streamed records in columnar mode (the store keeps updatedAt
+# for the refresh cursor; dimension fields feed the footprint index)
+STREAMED_FIELDS = STORED_FIELDS + tuple(f for f in DIMENSION_FIELDS if f not in STORED_FIELDS)
+
+# Low-cardinality string fields shared across records
+INTERNED_FIELDS = ("type", "subTypes", "websiteLink")
+
+
+class _ResponseReader:
+    """Async file-like view of a streaming httpx response, as ijson expects"""
+    
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+        self._buffer = b""
+    
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""
+        
+        while not self._buffer:
+            try:
+                self._buffer = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                return b""
+        
+        if size < 0:
+            size = len(self._buffer)
+        
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
 class ProductService:
     """Manages product database with intelligent search"""
     
-    def __init__(self, api_url: str):
+    # Attributes swapped together when a refreshed catalog goes live
+    INDEX_ATTRS = (
+        "store", "products", "by_website", "by_type", "by_subtype",
+        "type_prices", "subtype_prices", "subtypes_by_domain_type",
+        "theme_catalogs", "subtype_footprints", "total_products", "updated_cursor"
+    )
+    
+    # Fields compared when diffing catalog versions by productLink
+    FINGERPRINT_FIELDS = (
+        "productName", "priceUSD", "productImage", "websiteLink", "type", "subTypes"
+    )
+    
+    def __init__(
+        self,
+        api_url: str,
+        columnar: bool = PRODUCT_STORE_COLUMNAR,
+        snapshot_path: Optional[str] = PRODUCT_SNAPSHOT_PATH,
+        shared_dir: Optional[str] = PRODUCT_SHARED_CATALOG_DIR
+    ):
         self.api_url = api_url
+        # Only the columnar store can be shared between processes
+        self.columnar = columnar or bool(shared_dir)
+        self.snapshot_path = snapshot_path
+        self.shared = SharedCatalog(shared_dir) if shared_dir else None
+        self.shared_version: Optional[str] = None
+        self.store: Optional[ColumnarProductStore] = None
         self.products: List[Dict] = []
         self.by_website: Dict[str, List[Dict]] = defaultdict(list)
         self.by_type: Dict[str, List[Dict]] = defaultdict(list)
         self.by_subtype: Dict[str, Dict[str, List[Dict]]] = defaultdict(lambda: defaultdict(list))
+        self.type_prices: Dict[str, Tuple[array, array]] = {}
+        self.subtype_prices: Dict[str, Dict[str, Tuple[array, array]]] = {}
+        self.subtypes_by_domain_type: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self.theme_catalogs: Dict[str, Dict] = {}
+        self.subtype_footprints: Dict[Tuple[str, str], Dict] = {}
         self.total_products = 0
         
+        # Refresh state
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.updated_cursor: Optional[str] = None
+        self.last_refreshed_at: Optional[float] = None
+        self.loaded_from_snapshot = False
+        self.load_progress: Optional[Dict] = None
+        self._refresh_lock = asyncio.Lock()
+        
     async def initialize(self):
-        """Load and index all products from API"""
+        """
+        Load and index all products
+        
+        Uses the local snapshot when one exists (the caller should then
+        refresh in the background); otherwise loads from the API. In shared
+        mode, the first worker loads and publishes the catalog and the
+        others memory-map it.
+        """
+        if self.shared is not None:
+            await self._initialize_shared()
+            return
+        
+        await self._load_catalog()
+    
+    async def _initialize_shared(self):
+        """Attach to the published shared catalog, loading and publishing it first if needed"""
+        await asyncio.to_thread(self.shared.acquire)
+        try:
+            version = self.shared.current_version()
+            if version:
+                self._attach_shared(version)
+                return
+            
+            await self._load_catalog()
+            self._publish_shared()
+        finally:
+            self.shared.release()
+    
+    def _publish_shared(self):
+        """Publish the live store and switch this worker to the memory-mapped copy"""
+        version = self.shared.publish(self.store, self._catalog_meta())
+        self._attach_shared(version)
+    
+    def _catalog_meta(self) -> Dict:
+        """JSON-safe source/freshness info saved next to a persisted store"""
+        return {
+            "api_url": self.api_url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "updated_cursor": self.updated_cursor,
+            "subtype_footprints": [list(key) + [footprint] for key, footprint in self.subtype_footprints.items()],
+            "saved_at": time.time()
+        }
+    
+    def _fresh_from_store(self, store: ColumnarProductStore, meta: Dict) -> "ProductService":
+        """Indexes for a persisted columnar store (footprints and cursor come from its meta)"""
+        fresh = ProductService(self.api_url, columnar=True, snapshot_path=None, shared_dir=None)
+        fresh.store = store
+        fresh.total_products = store.size
+        fresh.updated_cursor = meta.get("updated_cursor")
+        fresh.subtype_footprints = {
+            (prod_type, subtype): footprint
+            for prod_type, subtype, footprint in meta.get("subtype_footprints", [])
+        }
+        fresh._build_catalog_indexes(store.category_triples())
+        return fresh
+    
+    def _attach_shared(self, version: str):
+        """Swap in a published shared catalog version"""
+        store, meta = self.shared.attach(version)
+        self._swap_in(self._fresh_from_store(store, meta))
+        
+        self.etag = meta.get("etag")
+        self.last_modified = meta.get("last_modified")
+        self.last_refreshed_at = meta.get("saved_at")
+        self.shared_version = version
+        
+        logger.info(f"🔗 Attached shared catalog {version}: {self.get_stats()}")
+    
+    async def _load_catalog(self):
+        """Load from the local snapshot, or from the API"""
+        if self._restore_snapshot():
+            return
+        
         logger.info(f"📦 Loading products from {self.api_url}")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(self.api_url)
-                response.raise_for_status()
-                
-                data = response.json()
-                self.products = data.get("data", [])
-                self.total_products = len(self.products)
-                
-                logger.info(f"✅ Loaded {self.total_products} products")
-                
-                # Build indexes for fast lookup
-                self._build_indexes()
-                
+            async with self._http_client() as client:
+                products, validators = await self._fetch_products(client)
+            
+            logger.info(f"✅ Loaded {len(products)} products")
+            
+            # Build indexes for fast lookup
+            self._swap_in(self._build_fresh(products))
+            self._set_validators(validators)
+            
         except Exception as e:
             logger.error(f"❌ Failed to load products: {e}")
             raise
+        
+        await self._save_snapshot()
+    
+    def _restore_snapshot(self) -> bool:
+        """Restore the catalog from the local snapshot if it matches this service, and index it"""
+        if not self.snapshot_path:
+            return False
+        
+        started = time.time()
+        payload = load_snapshot(self.snapshot_path)
+        if payload is None:
+            return False
+        
+        meta = payload["meta"]
+        if meta.get("api_url") != self.api_url or ("store" in payload) != self.columnar:
+            logger.info("📦 Catalog snapshot is for a different source/mode, ignoring")
+            return False
+        
+        if self.columnar:
+            self._swap_in(self._fresh_from_store(payload["store"], meta))
+        else:
+            self._swap_in(self._build_fresh(payload["products"]))
+        
+        self.etag = meta.get("etag")
+        self.last_modified = meta.get("last_modified")
+        self.last_refreshed_at = meta.get("saved_at")
+        self.loaded_from_snapshot = True
+        
+        logger.info(f"⚡ Restored catalog snapshot in {time.time() - started:.2f}s: {self.get_stats()}")
+        return True
+    
+    async def _save_snapshot(self):
+        """Persist the live catalog and indexes (best effort)"""
+        if not self.snapshot_path:
+            return
+        
+        # Capture references on the loop so a concurrent swap can't mix versions
+        meta = self._catalog_meta()
+        store = self.store if self.columnar else None
+        products = None if self.columnar else self.products
+        
+        try:
+            await asyncio.to_thread(save_snapshot, self.snapshot_path, meta, products, store)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save catalog snapshot: {e}")
+    
+    async def _fetch_products(
+        self,
+        client: httpx.AsyncClient,
+        conditional: bool = False,
+        cursor: bool = True
+    ) -> Tuple[Optional[List[Dict]], Optional[Dict]]:
+        """
+        Fetch products from the API
+        
+        Args:
+            client: HTTP client to use
+            conditional: Send ETag/Last-Modified validators and the updatedAt
+                cursor, so an unchanged catalog costs a 304
+            cursor: With conditional, also send the updatedAt cursor (False
+                fetches the full catalog)
+        
+        Returns:
+            (product list or None if the catalog has not changed, cache
+            validators of the response or None). Validators are not stored
+            here: the caller records them once the catalog is live, so a
+            body that fails to parse is fetched again next time.
+        """
+        headers = {}
+        params = {}
+        
+        if conditional:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+            if cursor and PRODUCT_API_UPDATED_SINCE_PARAM and self.updated_cursor:
+                params[PRODUCT_API_UPDATED_SINCE_PARAM] = self.updated_cursor
+        
+        if PRODUCT_API_PAGE_SIZE > 0:
+            # A partial catalog is better than none at boot, but a refresh
+            # must not drop the products of a failed page
+            return await self._fetch_pages(client, params, allow_partial=not conditional), None
+        
+        if not PRODUCT_API_STREAMING:
+            response = await client.get(self.api_url, headers=headers, params=params)
+            validators = self._accept_response(response)
+            if validators is None:
+                return None, None
+            
+            data = response.json()
+            return data.get("data", []), validators
+        
+        # Stream the body and parse the data array item by item, so the raw
+        # payload and its decoded text are never held in memory at once
+        async with client.stream("GET", self.api_url, headers=headers, params=params) as response:
+            validators = self._accept_response(response)
+            if validators is None:
+                return None, None
+            
+            products = []
+            reader = _ResponseReader(response)
+            async for product in ijson.items(reader, "data.item", use_float=True):
+                products.append(self._compact(product))
+            
+            return products, validators
+    
+    def _compact(self, product: Dict) -> Dict:
+        """
+        Shrink a streamed record
+        
+        Unlike json.loads, ijson does not share key strings between
+        records, so keys and repetitive values are interned here. In
+        columnar mode only the fields that survive packing are kept.
+        """
+        if self.columnar:
+            product = {k: product[k] for k in STREAMED_FIELDS if k in product}
+        
+        compact = {sys.intern(k): v for k, v in product.items()}
+        for field in INTERNED_FIELDS:
+            value = compact.get(field)
+            if isinstance(value, str):
+                compact[field] = sys.intern(value)
+        
+        return compact
+    
+    def _http_client(self) -> httpx.AsyncClient:
+        """HTTP client shared by all requests of one catalog load"""
+        return httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=PRODUCT_API_FETCH_CONCURRENCY)
+        )
+    
+    async def _fetch_pages(self, client: httpx.AsyncClient, params: Dict, allow_partial: bool) -> List[Dict]:
+        """
+        Fetch the catalog page by page with bounded concurrency
+        
+        The page count comes from the first page's pagination metadata when
+        present; otherwise pages are fetched in waves until a short page.
+        Pages that still fail after retries are skipped (and reported in
+        get_stats) when allow_partial is set, and fail the load otherwise.
+        """
+        page_size = PRODUCT_API_PAGE_SIZE
+        semaphore = asyncio.Semaphore(PRODUCT_API_FETCH_CONCURRENCY)
+        progress = self.load_progress = {
+            "pages_done": 0,
+            "pages_total": None,
+            "pages_failed": [],
+            "products": 0,
+            "finished": False
+        }
+        
+        async def fetch(page: int) -> Tuple[int, Optional[List[Dict]]]:
+            async with semaphore:
+                try:
+                    items = (await self._fetch_page(client, page, params)).get("data", [])
+                except Exception as e:
+                    logger.warning(f"⚠️ Product page {page} failed: {e}")
+                    progress["pages_failed"].append(page)
+                    return page, None
+            
+            progress["pages_done"] += 1
+            progress["products"] += len(items)
+            return page, [self._compact(p) for p in items]
+        
+        # First page decides how many more there are
+        first = await self._fetch_page(client, 1, params)
+        pages = {1: [self._compact(p) for p in first.get("data", [])]}
+        progress["pages_done"] = 1
+        progress["products"] = len(pages[1])
+        
+        total_pages = self._total_pages(first, page_size)
+        
+        if total_pages:
+            progress["pages_total"] = total_pages
+            results = await asyncio.gather(*(fetch(page) for page in range(2, total_pages + 1)))
+            pages.update(results)
+        else:
+            next_page = 2
+            more = len(pages[1]) >= page_size
+            
+            while more:
+                wave = range(next_page, next_page + PRODUCT_API_FETCH_CONCURRENCY)
+                results = await asyncio.gather(*(fetch(page) for page in wave))
+                pages.update(results)
+                next_page += PRODUCT_API_FETCH_CONCURRENCY
+                
+                fetched = [items for _, items in results if items is not None]
+                more = bool(fetched) and all(len(items) >= page_size for items in fetched)
+        
+        progress["finished"] = True
+        
+        failed = sorted(progress["pages_failed"])
+        if failed:
+            if not allow_partial:
+                raise Exception(f"{len(failed)} product pages failed: {failed}")
+            logger.warning(f"⚠️ Loaded catalog without {len(failed)} failed pages: {failed}")
+        
+        logger.info(f"📄 Fetched {progress['pages_done']} pages, {progress['products']} products")
+        
+        products = []
+        for page in sorted(pages):
+            products.extend(pages[page] or [])
+        return products
+    
+    async def _fetch_page(self, client: httpx.AsyncClient, page: int, params: Dict) -> Dict:
+        """Fetch one page, retrying with exponential backoff"""
+        page_params = dict(params)
+        page_params[PRODUCT_API_PAGE_PARAM] = page
+        page_params[PRODUCT_API_LIMIT_PARAM] = PRODUCT_API_PAGE_SIZE
+        
+        for attempt in range(PRODUCT_API_PAGE_RETRIES + 1):
+            try:
+                response = await client.get(self.api_url, params=page_params)
+                response.raise_for_status()
+                return response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                if attempt == PRODUCT_API_PAGE_RETRIES:
+                    raise
+                delay = 0.5 * 2 ** attempt
+                logger.info(f"   Page {page} attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _total_pages(payload: Dict, page_size: int) -> Optional[int]:
+        """Read the page count from common pagination metadata shapes"""
+        for container in (payload, payload.get("pagination"), payload.get("meta")):
+            if not isinstance(container, dict):
+                continue
+            
+            if container.get("totalPages"):
+                return int(container["totalPages"])
+            
+            for key in ("total", "totalCount", "totalProducts"):
+                if container.get(key):
+                    return math.ceil(int(container[key]) / page_size)
+        
+        return None
+    
+    @staticmethod
+    def _accept_response(response: httpx.Response) -> Optional[Dict]:
+        """Cache validators of a response; None if the catalog has not changed (304)"""
+        if response.status_code == 304:
+            return None
+        
+        response.raise_for_status()
+        
+        return {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+    
+    def _set_validators(self, validators: Optional[Dict]):
+        """Remember the validators of the catalog that is now live"""
+        if validators is not None:
+            self.etag = validators["etag"]
+            self.last_modified = validators["last_modified"]
+    
+    def _build_fresh(self, products: List[Dict]) -> "ProductService":
+        """Build a complete set of indexes for products without touching self"""
+        fresh = ProductService(self.api_url, columnar=self.columnar, snapshot_path=None, shared_dir=None)
+        fresh.products = products
+        fresh.total_products = len(products)
+        
+        cursors = [p["updatedAt"] for p in products if p.get("updatedAt")]
+        fresh.updated_cursor = max(cursors) if cursors else self.updated_cursor
+        
+        fresh._build_indexes()
+        return fresh
+    
+    def _swap_in(self, fresh: "ProductService"):
+        """
+        Make freshly built indexes live
+        
+        Runs on the event loop with no awaits, so in-flight request handlers
+        never observe a half-swapped catalog.
+        """
+        for attr in self.INDEX_ATTRS:
+            setattr(self, attr, getattr(fresh, attr))
+        
+        self.last_refreshed_at = time.time()
+    
+    def _current_records(self) -> List[Dict]:
+        """Get the live catalog as product dicts"""
+        if self.columnar:
+            return self.store.rows(range(self.store.size)) if self.store is not None else []
+        return self.products
+    
+    @classmethod
+    def _fingerprint(cls, product: Dict) -> tuple:
+        """Fields that identify a product version (empty values compare equal)"""
+        return tuple(product.get(field) or None for field in cls.FINGERPRINT_FIELDS)
+    
+    @staticmethod
+    def _keyed(products: List[Dict]) -> Dict[tuple, Dict]:
+        """Products keyed by (productLink, occurrence), so shared or missing links stay distinct"""
+        seen = Counter()
+        keyed = {}
+        for product in products:
+            link = product.get("productLink")
+            keyed[(link, seen[link])] = product
+            seen[link] += 1
+        return keyed
+    
+    def _merge_and_diff(
+        self,
+        incoming: List[Dict],
+        delta: bool
+    ) -> Optional[Tuple[List[Dict], Dict[str, int]]]:
+        """
+        Combine the live catalog with fetched products
+        
+        A full fetch replaces the catalog as-is; productLink only keys the
+        diff counts. A delta is merged into the live catalog by productLink,
+        which only works while every product has its own link.
+        
+        Args:
+            incoming: Fetched products
+            delta: Incoming holds only changed products (updatedAt cursor),
+                so unchanged live products are kept
+        
+        Returns:
+            (new product list, counts of added/removed/changed products), or
+            None if a delta can't be merged (missing or shared productLinks)
+        """
+        current = self._keyed(self._current_records())
+        fetched = self._keyed(incoming)
+        
+        if delta:
+            if any(not link or n for link, n in list(current) + list(fetched)):
+                return None
+            merged = dict(current)
+            merged.update(fetched)
+            products = list(merged.values())
+        else:
+            merged = fetched
+            products = incoming
+        
+        added = sum(1 for key in merged if key not in current)
+        removed = sum(1 for key in current if key not in merged)
+        changed = sum(
+            1 for key, product in merged.items()
+            if key in current and self._fingerprint(product) != self._fingerprint(current[key])
+        )
+        
+        return products, {"added": added, "removed": removed, "changed": changed}
+    
+    async def refresh(self) -> bool:
+        """
+        Re-fetch the catalog and swap in new indexes if it changed
+        
+        Returns:
+            True if a new catalog went live
+        """
+        async with self._refresh_lock:
+            if self.shared is None:
+                return await self._refresh_from_api()
+            
+            # One worker at a time talks to the API; the rest pick up its result
+            await asyncio.to_thread(self.shared.acquire)
+            try:
+                version = self.shared.current_version()
+                if version and version != self.shared_version:
+                    self._attach_shared(version)
+                    return True
+                
+                changed = await self._refresh_from_api()
+                if changed:
+                    self._publish_shared()
+                return changed
+            finally:
+                self.shared.release()
+    
+    async def _refresh_from_api(self) -> bool:
+        """Fetch, diff and swap in the catalog (caller holds the refresh lock)"""
+        delta = bool(PRODUCT_API_UPDATED_SINCE_PARAM and self.updated_cursor)
+        
+        async with self._http_client() as client:
+            incoming, validators = await self._fetch_products(client, conditional=True)
+            merged = None
+            if incoming is not None:
+                merged = await asyncio.to_thread(self._merge_and_diff, incoming, delta)
+            
+            if incoming is not None and merged is None:
+                logger.info("🔄 Products without a unique productLink, fetching the full catalog")
+                incoming, validators = await self._fetch_products(client, conditional=True, cursor=False)
+                if incoming is not None:
+                    merged = await asyncio.to_thread(self._merge_and_diff, incoming, False)
+        
+        if incoming is None:
+            logger.info("🔄 Catalog unchanged (304)")
+            self.last_refreshed_at = time.time()
+            return False
+        
+        products, diff = merged
+        
+        if not any(diff.values()):
+            logger.info("🔄 Catalog unchanged")
+            self._set_validators(validators)
+            self.last_refreshed_at = time.time()
+            return False
+        
+        # Index off the event loop, then swap on it
+        fresh = await asyncio.to_thread(self._build_fresh, products)
+        self._swap_in(fresh)
+        self._set_validators(validators)
+        await self._save_snapshot()
+        
+        logger.info(
+            f"🔄 Catalog refreshed: +{diff['added']} -{diff['removed']} ~{diff['changed']} "
+            f"({self.total_products} products)"
+        )
+        return True
+    
+    async def run_refresher(self, interval_seconds: float, immediate: bool = False):
+        """
+        Periodically refresh the catalog until cancelled
+        
+        Args:
+            interval_seconds: Delay between refreshes (0 = no periodic refresh)
+            immediate: Refresh once right away (e.g. after restoring a snapshot)
+        """
+        if interval_seconds > 0:
+            logger.info(f"🔄 Catalog refresher every {interval_seconds:.0f}s")
+        
+        while True:
+            if not immediate:
+                if interval_seconds <= 0:
+                    return
+                await asyncio.sleep(interval_seconds)
+            immediate = False
+            
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Catalog refresh failed, keeping current catalog: {e}")
     
     def _build_indexes(self):
         """Build search indexes by website, type, and subtype"""
+        catalog_counts = Counter()
+        footprint_samples = defaultdict(list)
+        
         for product in self.products:
+            # Normalize domain once and carry it on the record
+            website = extract_domain(product.get("websiteLink", ""))
+            product["websiteDomain"] = website
+            
+            catalog_counts[(website, product.get("type"), product.get("subTypes"))] += 1
+            
+            # Collect sizes stated in names/size fields per subtype
+            dimensions = product_dimensions(product)
+            if dimensions and product.get("type") and product.get("subTypes"):
+                footprint_samples[(product["type"].lower(), product["subTypes"].lower())].append(dimensions)
+            
+            if self.columnar:
+                continue
+            
             # Index by website
-            website = self._extract_domain(product.get("websiteLink", ""))
             self.by_website[website].append(product)
             
             # Index by type
@@ -60,23 +698,104 @@ class ProductService:
             subtype = product.get("subTypes", "")
             self.by_subtype[prod_type][subtype].append(product)
         
-        logger.info(f"📊 Indexed: {len(self.by_website)} websites, {len(self.by_type)} types")
+        if self.columnar:
+            self._build_columnar_store()
+        else:
+            self._build_price_indexes()
+        
+        self._build_catalog_indexes(catalog_counts)
+        self._build_footprints(footprint_samples)
+        
+        logger.info(
+            f"📊 Indexed: {self.get_stats()}, {len(self.theme_catalogs)} themes, "
+            f"{len(self.subtype_footprints)} subtype footprints"
+        )
+    
+    def _build_footprints(self, samples: Dict[Tuple[str, str], List[Dict]]):
+        """Median footprint per (type, subtype) with enough parsed product sizes"""
+        self.subtype_footprints = {
+            key: median_footprint(sizes)
+            for key, sizes in samples.items()
+            if len(sizes) >= PRODUCT_FOOTPRINT_MIN_SAMPLES
+        }
+    
+    def _build_columnar_store(self):
+        """Move products into NumPy columns and release the raw dicts"""
+        self.store = ColumnarProductStore.from_products(self.products)
+        self.products = []
+        
+        logger.info(f"🧮 Columnar store: {self.store.size} rows, {self.store.nbytes() / 1e6:.1f} MB")
+    
+    def _build_price_indexes(self):
+        """Build price-sorted views of every type and subtype bucket"""
+        self.type_prices = {
+            prod_type: self._sort_by_price(bucket)
+            for prod_type, bucket in self.by_type.items()
+        }
+        self.subtype_prices = {
+            prod_type: {
+                subtype: self._sort_by_price(bucket)
+                for subtype, bucket in subtypes.items()
+            }
+            for prod_type, subtypes in self.by_subtype.items()
+        }
     
-    def _extract_domain(self, url: str) -> str:
-        """Extract clean domain from URL"""
-        if not url:
-            return ""
+    @staticmethod
+    def _sort_by_price(bucket: List[Dict]) -> Tuple[array, array]:
+        """
+        Return (sorted prices, bucket positions) for a bucket
         
-        # Remove protocol
-        domain = url.replace("https://", "").replace("http://", "")
+        Buckets keep their load order; the parallel arrays let a price
+        window be found with bisect and mapped back to bucket positions.
+        """
+        prices = [product.get("priceUSD", 0) or 0 for product in bucket]
+        order = sorted(range(len(bucket)), key=prices.__getitem__)
         
-        # Remove path
-        domain = domain.split("/")[0]
+        return array("d", (prices[i] for i in order)), array("L", order)
+    
+    def _build_catalog_indexes(self, catalog_counts: Dict[Tuple, int]):
+        """
+        Build theme catalogs and the domain x type -> subtypes index
         
-        # Remove www.
-        domain = domain.replace("www.", "")
+        Args:
+            catalog_counts: Product count per (domain, type, subtype) triple,
+                with None for a missing type or subtype
+        """
+        self.subtypes_by_domain_type = defaultdict(lambda: defaultdict(set))
+        by_domain = defaultdict(list)
         
-        return domain
+        for (domain, prod_type, subtype), count in catalog_counts.items():
+            by_domain[domain].append((prod_type, subtype, count))
+            
+            # Index subtypes by website and case-insensitive type
+            if subtype:
+                self.subtypes_by_domain_type[domain][(prod_type or "").lower()].add(subtype)
+        
+        # Precompute type -> sorted subtypes catalog for every theme
+        self.theme_catalogs = {}
+        
+        for theme, websites in THEMES.items():
+            theme_domains = {extract_domain(w) for w in websites}
+            
+            furniture_catalog = defaultdict(set)
+            total_products = 0
+            
+            for domain in theme_domains:
+                for prod_type, subtype, count in by_domain.get(domain, []):
+                    total_products += count
+                    
+                    if prod_type in (None, "Unknown") or subtype in (None, "Unknown"):
+                        continue
+                    
+                    furniture_catalog[prod_type].add(subtype)
+            
+            self.theme_catalogs[theme] = {
+                "furniture_catalog": {
+                    type_name: sorted(subtypes)
+                    for type_name, subtypes in sorted(furniture_catalog.items())
+                },
+                "total_products": total_products
+            }
     
     def search_products(
         self,
@@ -99,13 +818,20 @@ class ProductService:
         logger.info(f"🔍 Searching: {furniture_type} > {furniture_subtype}")
         logger.info(f"   Price: ${min_price:.0f} - ${max_price:.0f}")
         
+        if self.columnar:
+            return self._search_columnar(
+                furniture_type, furniture_subtype, theme_websites, min_price, max_price, limit
+            )
+        
         # Get products matching type and subtype
         candidates = self.by_subtype.get(furniture_type, {}).get(furniture_subtype, [])
+        price_view = self.subtype_prices.get(furniture_type, {}).get(furniture_subtype)
         
         if not candidates:
             # Fallback: search by type only
             logger.warning(f"⚠️ No exact subtype match, searching by type: {furniture_type}")
             candidates = self.by_type.get(furniture_type, [])
+            price_view = self.type_prices.get(furniture_type)
         
         if not candidates:
             logger.warning(f"⚠️ No products found for {furniture_type}")
@@ -113,12 +839,14 @@ class ProductService:
         
         logger.info(f"   Found {len(candidates)} candidates")
         
-        # Filter by price with tolerance
+        # Filter by price with tolerance (bisect on the price-sorted view)
         price_tolerance = 0.25  # Allow 25% price variance
-        in_budget = [
-            p for p in candidates
-            if (min_price * (1 - price_tolerance)) <= p.get("priceUSD", 0) <= (max_price * (1 + price_tolerance))
-        ]
+        prices, order = price_view
+        lo = bisect_left(prices, min_price * (1 - price_tolerance))
+        hi = bisect_right(prices, max_price * (1 + price_tolerance))
+        
+        # Restore load order so results rank the same as a linear filter
+        in_budget = [candidates[i] for i in sorted(order[lo:hi])]
         
         logger.info(f"   {len(in_budget)} within budget (±25%)")
         
@@ -128,14 +856,13 @@ class ProductService:
             in_budget = candidates
         
         # Prioritize theme websites
-        theme_domains = [self._extract_domain(w) for w in theme_websites]
+        theme_domains = {extract_domain(w) for w in theme_websites}
         
         priority_products = []
         other_products = []
         
         for product in in_budget:
-            product_domain = self._extract_domain(product.get("websiteLink", ""))
-            if product_domain in theme_domains:
+            if product["websiteDomain"] in theme_domains:
                 priority_products.append(product)
             else:
                 other_products.append(product)
@@ -149,14 +876,107 @@ class ProductService:
         # Return top results
         return results[:limit]
     
+    def _search_columnar(
+        self,
+        furniture_type: str,
+        furniture_subtype: str,
+        theme_websites: List[str],
+        min_price: float,
+        max_price: float,
+        limit: int
+    ) -> List[Dict]:
+        """Same filtering as search_products, as vectorized masks over the columnar store"""
+        store = self.store
+        
+        type_mask = store.category_mask("type", furniture_type)
+        candidates = type_mask & store.category_mask("subtype", furniture_subtype)
+        
+        if not candidates.any():
+            logger.warning(f"⚠️ No exact subtype match, searching by type: {furniture_type}")
+            candidates = type_mask
+        
+        candidate_count = int(candidates.sum())
+        if not candidate_count:
+            logger.warning(f"⚠️ No products found for {furniture_type}")
+            return []
+        
+        logger.info(f"   Found {candidate_count} candidates")
+        
+        # Filter by price with tolerance
+        price_tolerance = 0.25  # Allow 25% price variance
+        in_budget = candidates & store.price_mask(
+            min_price * (1 - price_tolerance),
+            max_price * (1 + price_tolerance)
+        )
+        
+        logger.info(f"   {int(in_budget.sum())} within budget (±25%)")
+        
+        if not in_budget.any():
+            logger.warning(f"⚠️ No products in budget, using all candidates")
+            in_budget = candidates
+        
+        # Prioritize theme websites
+        from_theme = store.domains_mask({extract_domain(w) for w in theme_websites})
+        priority = np.flatnonzero(in_budget & from_theme)
+        other = np.flatnonzero(in_budget & ~from_theme)
+        
+        logger.info(f"   ✨ {len(priority)} from theme websites")
+        logger.info(f"   📦 {len(other)} from other websites")
+        
+        return store.rows(np.concatenate([priority, other])[:limit])
+    
+    def has_type(self, furniture_type: str) -> bool:
+        """Check whether any product has the given furniture type"""
+        if self.columnar:
+            return self.store is not None and self.store.code("type", furniture_type) != MISSING
+        return bool(self.by_type.get(furniture_type))
+    
     def get_available_types(self) -> List[str]:
         """Get all available furniture types"""
+        if self.columnar:
+            return list(self.store.vocab["type"]) if self.store is not None else []
         return list(self.by_type.keys())
     
     def get_available_subtypes(self, furniture_type: str) -> List[str]:
         """Get all available subtypes for a furniture type"""
+        if self.columnar:
+            if self.store is None:
+                return []
+            codes = self.store.columns["subtype_code"][self.store.category_mask("type", furniture_type)]
+            return [self.store.value("subtype", int(c)) for c in np.unique(codes) if c != MISSING]
         return list(self.by_subtype.get(furniture_type, {}).keys())
     
+    def get_subtypes_for_domains(self, domains: List[str], furniture_type: str) -> List[str]:
+        """Get sorted subtypes of a furniture type (case-insensitive) across the given website domains"""
+        type_key = furniture_type.lower()
+        
+        subtypes = set()
+        for domain in domains:
+            subtypes |= self.subtypes_by_domain_type.get(domain, {}).get(type_key, set())
+        
+        return sorted(subtypes)
+    
+    def get_subtype_footprint(self, furniture_type: str, subtype: str) -> Optional[Dict]:
+        """Get the median catalog footprint of a subtype (case-insensitive), if known"""
+        footprint = self.subtype_footprints.get(((furniture_type or "").lower(), (subtype or "").lower()))
+        return dict(footprint) if footprint else None
+    
+    def get_theme_catalog(self, theme: str) -> Dict:
+        """Get precomputed furniture catalog and product count for a theme"""
+        return self.theme_catalogs.get(theme, {"furniture_catalog": {}, "total_products": 0})
+    
     def get_stats(self) -> str:
         """Get database statistics"""
-        return f"{self.total_products} products, {len(self.by_website)} websites, {len(self.by_type)} categories"
\ No newline at end of file
+        if self.columnar and self.store is not None:
+            websites, types = len(self.store.vocab["domain"]), len(self.store.vocab["type"])
+        else:
+            websites, types = len(self.by_website), len(self.by_type)
+        stats = f"{self.total_products} products, {websites} websites, {types} categories"
+        
+        progress = self.load_progress
+        if progress and not progress["finished"]:
+            stats += f", loading {progress['pages_done']}/{progress['pages_total'] or '?'} pages"
+        elif progress and progress["pages_failed"]:
+            stats += f", {len(progress['pages_failed'])} pages failed"
+        
+        return stats
\ No newline at end of file
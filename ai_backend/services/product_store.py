@@ -0,0 +1,195 @@
+"""
+Columnar Product Store
+======================
+NumPy-backed product catalog for vectorized filtering
+"""
+
+import os
+import json
+import logging
+import numpy as np
+from collections import Counter
+from typing import List, Dict, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Low-cardinality fields stored as integer codes into a string table
+CATEGORY_FIELDS = {
+    "type": "type",
+    "subtype": "subTypes",
+    "domain": "websiteDomain",
+}
+
+# Per-product strings stored as one UTF-8 blob plus offsets (dimensions and
+# updatedAt are kept so rows rebuilt on refresh still feed the footprint
+# index and the refresh cursor)
+STRING_FIELDS = ("productName", "productLink", "productImage", "websiteLink", "dimensions", "updatedAt")
+
+# Raw product fields the store keeps
+STORED_FIELDS = ("priceUSD", "type", "subTypes") + STRING_FIELDS
+
+# Code used for a missing category value
+MISSING = -1
+
+
+class ColumnarProductStore:
+    """Product catalog held as NumPy columns instead of per-product dicts"""
+    
+    def __init__(self, columns: Dict[str, np.ndarray], vocab: Dict[str, List[str]]):
+        self.columns = columns
+        self.vocab = vocab
+        self.size = len(columns["price"])
+        self._codes = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in vocab.items()
+        }
+    
+    @classmethod
+    def from_products(cls, products: List[Dict]) -> "ColumnarProductStore":
+        """Build columns from product dicts (websiteDomain already normalized)"""
+        size = len(products)
+        
+        prices = np.zeros(size, dtype=np.float64)
+        vocab: Dict[str, List[str]] = {name: [] for name in CATEGORY_FIELDS}
+        codes = {name: np.full(size, MISSING, dtype=np.int32) for name in CATEGORY_FIELDS}
+        lookup: Dict[str, Dict[str, int]] = {name: {} for name in CATEGORY_FIELDS}
+        strings: Dict[str, List[bytes]] = {field: [] for field in STRING_FIELDS}
+        
+        for i, product in enumerate(products):
+            prices[i] = product.get("priceUSD", 0) or 0
+            
+            for name, field in CATEGORY_FIELDS.items():
+                value = product.get(field, "")
+                if value is None:
+                    continue
+                code = lookup[name].get(value)
+                if code is None:
+                    code = lookup[name][value] = len(vocab[name])
+                    vocab[name].append(value)
+                codes[name][i] = code
+            
+            for field in STRING_FIELDS:
+                value = product.get(field)
+                strings[field].append(str(value).encode("utf-8") if value else b"")
+        
+        columns = {"price": prices}
+        for name in CATEGORY_FIELDS:
+            columns[f"{name}_code"] = codes[name]
+        for field in STRING_FIELDS:
+            offsets, data = cls._pack_strings(strings[field])
+            columns[f"{field}_offsets"] = offsets
+            columns[f"{field}_data"] = data
+        
+        return cls(columns, vocab)
+    
+    @staticmethod
+    def _pack_strings(values: List[bytes]):
+        """Pack encoded strings into (offsets, blob) arrays"""
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in values], out=offsets[1:])
+        data = np.frombuffer(b"".join(values), dtype=np.uint8)
+        return offsets, data
+    
+    def code(self, name: str, value: Optional[str]) -> int:
+        """Get the integer code of a category value (MISSING if absent)"""
+        return self._codes[name].get(value, MISSING)
+    
+    def value(self, name: str, code: int) -> Optional[str]:
+        """Get the category value for an integer code"""
+        return self.vocab[name][code] if code != MISSING else None
+    
+    def string(self, field: str, index: int) -> str:
+        """Decode a per-product string field"""
+        offsets = self.columns[f"{field}_offsets"]
+        data = self.columns[f"{field}_data"]
+        return data[offsets[index]:offsets[index + 1]].tobytes().decode("utf-8")
+    
+    def category_mask(self, name: str, value: Optional[str]) -> np.ndarray:
+        """Boolean mask of products whose category equals value"""
+        code = self.code(name, value)
+        if code == MISSING:
+            return np.zeros(self.size, dtype=bool)
+        return self.columns[f"{name}_code"] == code
+    
+    def domains_mask(self, domains: Iterable[str]) -> np.ndarray:
+        """Boolean mask of products from any of the given domains"""
+        codes = [self.code("domain", d) for d in domains]
+        return np.isin(self.columns["domain_code"], [c for c in codes if c != MISSING])
+    
+    def price_mask(self, low: float, high: float) -> np.ndarray:
+        """Boolean mask of products priced within [low, high]"""
+        prices = self.columns["price"]
+        return (prices >= low) & (prices <= high)
+    
+    def row(self, index: int) -> Dict:
+        """Materialize a single product as a dict"""
+        index = int(index)
+        product = {"priceUSD": float(self.columns["price"][index])}
+        
+        for name, field in CATEGORY_FIELDS.items():
+            value = self.value(name, int(self.columns[f"{name}_code"][index]))
+            if value:
+                product[field] = value
+        
+        for field in STRING_FIELDS:
+            value = self.string(field, index)
+            if value:
+                product[field] = value
+        
+        return product
+    
+    def rows(self, indices: Iterable[int]) -> List[Dict]:
+        """Materialize several products as dicts"""
+        return [self.row(i) for i in indices]
+    
+    def category_triples(self) -> Dict[tuple, int]:
+        """Count products per (domain, type, subtype) triple, None for missing/empty values"""
+        stacked = np.stack([
+            self.columns["domain_code"],
+            self.columns["type_code"],
+            self.columns["subtype_code"],
+        ], axis=1)
+        
+        triples, counts = np.unique(stacked, axis=0, return_counts=True)
+        
+        result = Counter()
+        for (d, t, s), count in zip(triples, counts):
+            key = (
+                self.value("domain", int(d)) or "",
+                self.value("type", int(t)) or None,
+                self.value("subtype", int(s)) or None,
+            )
+            result[key] += int(count)
+        return result
+    
+    def save(self, directory: str):
+        """Write every column as a .npy file plus a JSON manifest with the string tables"""
+        os.makedirs(directory, exist_ok=True)
+        
+        for name, column in self.columns.items():
+            np.save(os.path.join(directory, f"{name}.npy"), column)
+        
+        manifest = {"columns": list(self.columns), "vocab": self.vocab}
+        with open(os.path.join(directory, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+    
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "ColumnarProductStore":
+        """
+        Open a store written by save()
+        
+        With mmap, columns are read-only memory maps, so every process that
+        opens the same directory shares one copy through the page cache.
+        """
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = json.load(f)
+        
+        columns = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None, allow_pickle=False)
+            for name in manifest["columns"]
+        }
+        return cls(columns, manifest["vocab"])
+    
+    def nbytes(self) -> int:
+        """Total bytes held by the columns"""
+        return sum(column.nbytes for column in self.columns.values())
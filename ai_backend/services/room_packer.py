@@ -0,0 +1,230 @@
+"""
+Room Packer
+===========
+Fast 2D rectangle packing of furniture footprints into the room floor
+"""
+
+import re
+import math
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Items this low (rugs, mats) sit under other furniture and are not packed
+FLOOR_COVERING_MAX_HEIGHT_CM = 3
+# Whole words naming a floor covering, for footprints without a height
+FLOOR_COVERING_WORDS = {"rug", "rugs", "carpet", "carpets", "mat", "mats"}
+
+# (x, y, length along x, width along y) in cm
+Rect = Tuple[float, float, float, float]
+
+EPSILON = 1e-6
+
+
+class RoomPacker:
+    """
+    Bottom-left candidate-point packer with 90° rotation
+    
+    Each item claims its footprint plus a walkway strip of `clearance`
+    along one long side (the access side of beds, sofas, desks and
+    storage). Walkways may overlap each other, as they are shared in a
+    real room, but never another item's footprint, so a packing that
+    succeeds leaves every piece reachable. Several item orderings are
+    tried; the first one that places everything wins.
+    """
+    
+    def __init__(self, room_length: float, room_width: float, clearance: float):
+        self.room_length = room_length
+        self.room_width = room_width
+        self.clearance = clearance
+    
+    def pack(self, items: List[Dict]) -> Dict:
+        """
+        Find a candidate layout
+        
+        Args:
+            items: Dicts with "width_cm"/"depth_cm" (or "sqcm" only) and
+                optionally "height_cm", "subtype", "type"
+        
+        Returns:
+            {"packed": bool, "placements": [...], "unplaced": [...],
+             "skipped": [...]}. Placements give the item's corner (x_cm, y_cm)
+            and extent (length_cm along x, width_cm along y) in cm from the
+            room's corner, x running along the room length.
+        """
+        rects = []
+        skipped = []
+        
+        for index, item in enumerate(items):
+            if _is_floor_covering(item):
+                skipped.append(_label(item, index))
+                continue
+            width, depth = _footprint(item)
+            rects.append((index, max(width, depth), min(width, depth)))
+        
+        best = None
+        for order in self._orderings(rects):
+            placements, unplaced = self._pack_order(order)
+            if not unplaced:
+                best = (placements, unplaced)
+                break
+            if best is None or len(unplaced) < len(best[1]):
+                best = (placements, unplaced)
+        
+        placements, unplaced = best if best else ([], [])
+        
+        return {
+            "packed": not unplaced,
+            "placements": [
+                {"item": _label(items[index], index), **placement}
+                for index, placement in sorted(placements, key=lambda p: p[0])
+            ],
+            "unplaced": [_label(items[index], index) for index in unplaced],
+            "skipped": skipped,
+            "clearance_cm": round(self.clearance, 1)
+        }
+    
+    def _orderings(self, rects: List[Tuple[int, float, float]]):
+        """Item orders to try: largest area, longest side, largest claim first"""
+        yield sorted(rects, key=lambda r: r[1] * r[2], reverse=True)
+        yield sorted(rects, key=lambda r: r[1], reverse=True)
+        yield sorted(rects, key=lambda r: r[1] * (r[2] + self.clearance), reverse=True)
+    
+    def _pack_order(self, rects: List[Tuple[int, float, float]]):
+        """Place rects in the given order, lowest then leftmost spot first; returns (placements, unplaced indices)"""
+        solids: List[Rect] = []
+        walkways: List[Rect] = []
+        placements = []
+        unplaced = []
+        
+        for index, long_side, short_side in rects:
+            best = None
+            
+            # Unrotated the long side runs along x and the walkway is at ±y;
+            # rotated it runs along y and the walkway is at ±x
+            for rotated in (False, True):
+                w, d = (short_side, long_side) if rotated else (long_side, short_side)
+                for side in (("+x", "-x") if rotated else ("+y", "-y")):
+                    spot = self.lowest_spot(w, d, side, solids, walkways, best[0] if best else None)
+                    if spot is None:
+                        continue
+                    rect, walkway = spot
+                    key = (rect[1], rect[0])
+                    if best is None or key < best[0]:
+                        best = (key, rect, walkway, rotated, side)
+            
+            if best is None:
+                unplaced.append(index)
+                continue
+            
+            _, rect, walkway, rotated, side = best
+            solids.append(rect)
+            walkways.append(walkway)
+            
+            placements.append((index, {
+                "x_cm": round(rect[0], 1),
+                "y_cm": round(rect[1], 1),
+                "length_cm": round(rect[2], 1),
+                "width_cm": round(rect[3], 1),
+                "rotated": rotated,
+                "walkway_side": side
+            }))
+        
+        return placements, unplaced
+    
+    def lowest_spot(
+        self,
+        w: float,
+        d: float,
+        side: str,
+        solids: List[Rect],
+        walkways: List[Rect],
+        limit: Optional[Tuple[float, float]] = None
+    ) -> Optional[Tuple[Rect, Rect]]:
+        """
+        Lowest, then leftmost free (footprint, walkway), or None
+        
+        Rows are tried at y positions flush with a wall or a placed rect,
+        none past limit (the best (y, x) found so far in another
+        orientation). Within a row, each nearby rect rules out an open
+        interval of x, and the first x outside all of them wins.
+        """
+        c = self.clearance
+        # Walkway x extent relative to the item's x
+        wx_offset, wx_length = {"+x": (w, c), "-x": (-c, c)}.get(side, (0.0, w))
+        low_x = max(0.0, -wx_offset)
+        high_x = min(self.room_length - w, self.room_length - wx_offset - wx_length)
+        
+        for y in self._rows(d, side, solids + walkways):
+            if limit is not None and y > limit[0] + EPSILON:
+                return None
+            
+            _, wy, _, wd = self._walkway((0.0, y, w, d), side)
+            if wy < -EPSILON or wy + wd > self.room_width + EPSILON:
+                continue
+            
+            blocked = [
+                (r[0] - w, r[0] + r[2]) for r in solids + walkways
+                if r[1] < y + d - EPSILON and r[1] + r[3] > y + EPSILON
+            ]
+            blocked += [
+                (r[0] - wx_offset - wx_length, r[0] + r[2] - wx_offset) for r in solids
+                if r[1] < wy + wd - EPSILON and r[1] + r[3] > wy + EPSILON
+            ]
+            
+            x = low_x
+            for start, end in sorted(blocked):
+                if start >= x - EPSILON:
+                    break
+                x = max(x, end)
+            
+            if x <= high_x + EPSILON:
+                rect = (x, y, w, d)
+                return rect, self._walkway(rect, side)
+        
+        return None
+    
+    def _rows(self, d: float, side: str, placed: List[Rect]) -> List[float]:
+        """Sorted y positions where the item, or its walkway, is flush with a wall or a placed rect"""
+        edges = {0.0, float(self.room_width)}
+        for _, y, _, wy in placed:
+            edges.update((y, y + wy))
+        
+        shifts = {"+y": (0.0, -d - self.clearance), "-y": (self.clearance, -d)}.get(side, (0.0, -d))
+        return sorted({e + s for e in edges for s in shifts if -EPSILON <= e + s <= self.room_width - d + EPSILON})
+    
+    def _walkway(self, rect: Rect, side: str) -> Rect:
+        """Walkway strip along one side of a footprint"""
+        x, y, lx, wy = rect
+        c = self.clearance
+        return {
+            "+y": (x, y + wy, lx, c),
+            "-y": (x, y - c, lx, c),
+            "+x": (x + lx, y, c, wy),
+            "-x": (x - c, y, c, wy),
+        }[side]
+
+
+def _footprint(item: Dict) -> Tuple[float, float]:
+    """(width, depth) in cm; a square of the same area when only sqcm is known"""
+    width, depth = item.get("width_cm"), item.get("depth_cm")
+    if width and depth:
+        return float(width), float(depth)
+    side = math.sqrt(float(item.get("sqcm") or 0))
+    return side, side
+
+
+def _is_floor_covering(item: Dict) -> bool:
+    """Rugs and mats: very low items, or named so (catalog footprints rarely have a height)"""
+    height = item.get("height_cm")
+    if height is not None and height <= FLOOR_COVERING_MAX_HEIGHT_CM:
+        return True
+    
+    text = f"{item.get('subtype') or ''} {item.get('type') or ''}".lower()
+    return any(word in FLOOR_COVERING_WORDS for word in re.findall(r"[a-z]+", text))
+
+
+def _label(item: Dict, index: int) -> str:
+    """Human-readable name of an item"""
+    return item.get("subtype") or item.get("type") or f"item {index + 1}"
@@ -0,0 +1,97 @@
+"""
+Shared Catalog
+==============
+Columnar catalog published once and memory-mapped read-only by every worker
+"""
+
+import os
+import json
+import time
+import fcntl
+import shutil
+import logging
+from typing import Dict, Optional, Tuple
+from ai_backend.services.product_store import ColumnarProductStore
+
+logger = logging.getLogger(__name__)
+
+
+class SharedCatalog:
+    """
+    Versioned columnar catalog in a directory shared by worker processes
+    
+    Layout:
+        <directory>/.lock          flock held while loading or publishing
+        <directory>/CURRENT        name of the live version
+        <directory>/<version>/     columns (.npy), manifest.json, meta.json
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock_fd: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+    
+    def acquire(self):
+        """Block until this process holds the catalog lock (call off the event loop)"""
+        fd = os.open(os.path.join(self.directory, ".lock"), os.O_CREAT | os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        self._lock_fd = fd
+    
+    def release(self):
+        """Release the catalog lock"""
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+    
+    def current_version(self) -> Optional[str]:
+        """Name of the live version, if any has been published"""
+        try:
+            with open(os.path.join(self.directory, "CURRENT")) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        
+        return version if version and os.path.isdir(os.path.join(self.directory, version)) else None
+    
+    def publish(self, store: ColumnarProductStore, meta: Dict) -> str:
+        """
+        Write a new version and make it live (caller holds the lock)
+        
+        Returns:
+            The new version name
+        """
+        version = f"v{int(time.time() * 1000)}-{os.getpid()}"
+        version_dir = os.path.join(self.directory, version)
+        
+        store.save(version_dir)
+        with open(os.path.join(version_dir, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        
+        # Swap the pointer atomically
+        pointer_tmp = os.path.join(self.directory, f"CURRENT.{os.getpid()}.tmp")
+        with open(pointer_tmp, "w") as f:
+            f.write(version)
+        os.replace(pointer_tmp, os.path.join(self.directory, "CURRENT"))
+        
+        self._prune(keep=version)
+        
+        logger.info(f"📤 Published shared catalog {version} ({store.size} products)")
+        return version
+    
+    def attach(self, version: str) -> Tuple[ColumnarProductStore, Dict]:
+        """Memory-map a published version read-only"""
+        version_dir = os.path.join(self.directory, version)
+        
+        store = ColumnarProductStore.load(version_dir, mmap=True)
+        with open(os.path.join(version_dir, "meta.json")) as f:
+            meta = json.load(f)
+        
+        return store, meta
+    
+    def _prune(self, keep: str):
+        """Delete superseded versions (existing memory maps stay valid after unlink)"""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name != keep and name.startswith("v") and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
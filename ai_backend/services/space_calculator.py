@@ -460,12 +460,52 @@ Intelligent furniture placement using square centimeters consistently
 
 import logging
 import json
-from openai import OpenAI
-from typing import List, Dict
-from ai_backend.config import OPENAI_API_KEY, MAX_ROOM_USAGE_PERCENT
+import asyncio
+import httpx
+from openai import AsyncOpenAI
+from typing import List, Dict, Optional, Tuple, Union
+from ai_backend.config import (
+    OPENAI_API_KEY,
+    OPENAI_MAX_CONNECTIONS,
+    MAX_ROOM_USAGE_PERCENT,
+    MIN_WALKWAY_SPACE_CM,
+    ROOM_PACKING_ENABLED,
+    ESTIMATE_CONCURRENCY,
+    ESTIMATE_BATCH_SIZE
+)
+from ai_backend.services.dimension_cache import dimension_cache
+from ai_backend.services.dimension_table import dimension_table
+from ai_backend.services.layout_planner import LayoutPlanner
 
 logger = logging.getLogger(__name__)
-client = OpenAI(api_key=OPENAI_API_KEY)
+
+# Model estimates in flight, by dimension cache key (single-flight)
+_inflight_estimates: Dict[str, "asyncio.Task"] = {}
+
+# Canonical sizes shown to the model in every dimension prompt
+REFERENCE_EXAMPLES = """Real-world examples for reference (in CENTIMETERS):
+- Queen Bed: {"width_cm": 152, "depth_cm": 203, "height_cm": 122, "notes": "Standard queen size (152x203 cm)"}
+- 3-Seater Sofa: {"width_cm": 213, "depth_cm": 97, "height_cm": 91, "notes": "Standard 3-seater (213x97 cm)"}
+- Dining Table (6-seater): {"width_cm": 183, "depth_cm": 91, "height_cm": 76, "notes": "6-person table (183x91 cm)"}
+- Coffee Table: {"width_cm": 122, "depth_cm": 61, "height_cm": 46, "notes": "Standard coffee table (122x61 cm)"}
+- Nightstand: {"width_cm": 61, "depth_cm": 46, "height_cm": 61, "notes": "Bedside table (61x46 cm)"}
+- Bookshelf: {"width_cm": 91, "depth_cm": 30, "height_cm": 183, "notes": "Standard bookcase (91x30 cm)"}
+- Office Desk: {"width_cm": 122, "depth_cm": 61, "height_cm": 76, "notes": "Standard desk (122x61 cm)"}
+- Dining Chair: {"width_cm": 46, "depth_cm": 51, "height_cm": 91, "notes": "Standard chair (46x51 cm)"}
+- Wardrobe: {"width_cm": 122, "depth_cm": 61, "height_cm": 213, "notes": "Standard wardrobe (122x61 cm)"}
+- Side Table: {"width_cm": 46, "depth_cm": 46, "height_cm": 56, "notes": "Small side table (46x46 cm)"}"""
+
+# Non-blocking client with one connection pool shared by all requests
+client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY,
+    http_client=httpx.AsyncClient(
+        timeout=60.0,
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_CONNECTIONS
+        )
+    )
+)
 
 
 class SpaceCalculator:
@@ -482,12 +522,99 @@ class SpaceCalculator:
         return length * width * height
     
     @staticmethod
-    def estimate_furniture_size(furniture_type: str, subtype: str, room_sqcm: float) -> Dict[str, float]:
+    def validate_dimensions(result: Dict) -> Dict:
+        """
+        Sanity-check a model dimension answer and add its floor area
+        
+        Raises:
+            ValueError: Missing or unrealistic dimensions
+        """
+        if not isinstance(result, dict) or not all(k in result for k in ["width_cm", "depth_cm", "height_cm"]):
+            raise ValueError("GPT response missing required dimensions")
+        
+        # Convert to float and validate
+        width_cm = float(result["width_cm"])
+        depth_cm = float(result["depth_cm"])
+        height_cm = float(result["height_cm"])
+        
+        # Sanity check: dimensions should be reasonable
+        if width_cm <= 0 or width_cm > 600:  # Max 600 cm (20 feet)
+            raise ValueError(f"Unrealistic width: {width_cm} cm")
+        if depth_cm <= 0 or depth_cm > 600:  # Max 600 cm (20 feet)
+            raise ValueError(f"Unrealistic depth: {depth_cm} cm")
+        if height_cm <= 0 or height_cm > 300:  # Max 300 cm (10 feet)
+            raise ValueError(f"Unrealistic height: {height_cm} cm")
+        
+        # Calculate floor area (square centimeters)
+        sqcm = width_cm * depth_cm
+        
+        result["width_cm"] = round(width_cm, 2)
+        result["depth_cm"] = round(depth_cm, 2)
+        result["height_cm"] = round(height_cm, 2)
+        result["sqcm"] = round(sqcm, 2)
+        
+        return result
+    
+    @staticmethod
+    def known_dimensions(furniture_type: str, subtype: str, product_service=None) -> Optional[Dict[str, float]]:
+        """
+        Dimensions available without the model: the median footprint of
+        matching catalog products, else the offline dimension table
+        """
+        if product_service is not None:
+            footprint = product_service.get_subtype_footprint(furniture_type, subtype)
+            if footprint:
+                logger.info(f"📐 Catalog footprint for: {subtype} ({furniture_type}), {footprint['samples']} products")
+                return footprint
+        
+        known = dimension_table.lookup(furniture_type, subtype)
+        if known:
+            logger.info(f"📏 Table dimensions for: {subtype} ({furniture_type})")
+        return known
+    
+    @staticmethod
+    async def estimate_furniture_size(
+        furniture_type: str,
+        subtype: str,
+        room_sqcm: float,
+        product_service=None
+    ) -> Dict[str, float]:
         """
         Use GPT-4 to estimate furniture floor space
         Returns dimensions in CENTIMETERS and area in SQUARE CENTIMETERS
+        
+        Catalog footprints (when product_service is given) and the offline
+        dimension table answer first; model estimates are cached by type,
+        subtype and room-size bucket, and concurrent callers asking for the
+        same cache key share one in-flight model call.
         """
         
+        known = SpaceCalculator.known_dimensions(furniture_type, subtype, product_service)
+        if known:
+            return known
+        
+        cache_key = dimension_cache.make_key(furniture_type, subtype, room_sqcm)
+        cached = await asyncio.to_thread(dimension_cache.get, cache_key)
+        if cached:
+            logger.info(f"⚡ Cached dimensions for: {subtype} ({furniture_type})")
+            return cached
+        
+        task = _inflight_estimates.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(
+                SpaceCalculator._estimate_with_model(furniture_type, subtype, room_sqcm, cache_key)
+            )
+            _inflight_estimates[cache_key] = task
+            task.add_done_callback(lambda done: _forget_estimate(cache_key, done))
+        else:
+            logger.info(f"🔗 Joining in-flight estimate for: {subtype} ({furniture_type})")
+        
+        # Shield so one caller giving up doesn't cancel the call for the others
+        return dict(await asyncio.shield(task))
+    
+    @staticmethod
+    async def _estimate_with_model(furniture_type: str, subtype: str, room_sqcm: float, cache_key: str) -> Dict[str, float]:
+        """Ask GPT-4 for dimensions, validate and cache them"""
         prompt = f"""You are an interior design expert. Estimate realistic dimensions for this furniture.
 
 Furniture Type: {furniture_type}
@@ -502,17 +629,7 @@ Provide typical dimensions in CENTIMETERS as JSON (no markdown, just JSON):
     "notes": "<brief explanation>"
 }}
 
-Real-world examples for reference (in CENTIMETERS):
-- Queen Bed: {{"width_cm": 152, "depth_cm": 203, "height_cm": 122, "notes": "Standard queen size (152x203 cm)"}}
-- 3-Seater Sofa: {{"width_cm": 213, "depth_cm": 97, "height_cm": 91, "notes": "Standard 3-seater (213x97 cm)"}}
-- Dining Table (6-seater): {{"width_cm": 183, "depth_cm": 91, "height_cm": 76, "notes": "6-person table (183x91 cm)"}}
-- Coffee Table: {{"width_cm": 122, "depth_cm": 61, "height_cm": 46, "notes": "Standard coffee table (122x61 cm)"}}
-- Nightstand: {{"width_cm": 61, "depth_cm": 46, "height_cm": 61, "notes": "Bedside table (61x46 cm)"}}
-- Bookshelf: {{"width_cm": 91, "depth_cm": 30, "height_cm": 183, "notes": "Standard bookcase (91x30 cm)"}}
-- Office Desk: {{"width_cm": 122, "depth_cm": 61, "height_cm": 76, "notes": "Standard desk (122x61 cm)"}}
-- Dining Chair: {{"width_cm": 46, "depth_cm": 51, "height_cm": 91, "notes": "Standard chair (46x51 cm)"}}
-- Wardrobe: {{"width_cm": 122, "depth_cm": 61, "height_cm": 213, "notes": "Standard wardrobe (122x61 cm)"}}
-- Side Table: {{"width_cm": 46, "depth_cm": 46, "height_cm": 56, "notes": "Small side table (46x46 cm)"}}
+{REFERENCE_EXAMPLES}
 
 Important:
 1. Dimensions should be in CENTIMETERS (not inches or feet)
@@ -525,7 +642,7 @@ Respond ONLY with valid JSON, no other text."""
         try:
             logger.info(f"🤖 GPT-4 estimating dimensions for: {subtype} ({furniture_type})")
             
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model="gpt-4o",
                 messages=[
                     {
@@ -546,34 +663,13 @@ Respond ONLY with valid JSON, no other text."""
             
             result = json.loads(result_text)
             
-            # Validate required fields
-            if not all(k in result for k in ["width_cm", "depth_cm", "height_cm"]):
-                raise ValueError("GPT response missing required dimensions")
-            
-            # Convert to float and validate
-            width_cm = float(result["width_cm"])
-            depth_cm = float(result["depth_cm"])
-            height_cm = float(result["height_cm"])
-            
-            # Sanity check: dimensions should be reasonable
-            if width_cm <= 0 or width_cm > 600:  # Max 600 cm (20 feet)
-                raise ValueError(f"Unrealistic width: {width_cm} cm")
-            if depth_cm <= 0 or depth_cm > 600:  # Max 600 cm (20 feet)
-                raise ValueError(f"Unrealistic depth: {depth_cm} cm")
-            if height_cm <= 0 or height_cm > 300:  # Max 300 cm (10 feet)
-                raise ValueError(f"Unrealistic height: {height_cm} cm")
+            result = SpaceCalculator.validate_dimensions(result)
             
-            # Calculate floor area (square centimeters)
-            sqcm = width_cm * depth_cm
-            
-            result["width_cm"] = round(width_cm, 2)
-            result["depth_cm"] = round(depth_cm, 2)
-            result["height_cm"] = round(height_cm, 2)
-            result["sqcm"] = round(sqcm, 2)
-            
-            logger.info(f"✅ Dimensions: {width_cm:.1f} cm W × {depth_cm:.1f} cm D × {height_cm:.1f} cm H = {sqcm:.2f} sq cm")
+            logger.info(f"✅ Dimensions: {result['width_cm']:.1f} cm W × {result['depth_cm']:.1f} cm D × {result['height_cm']:.1f} cm H = {result['sqcm']:.2f} sq cm")
             logger.info(f"   Notes: {result.get('notes', 'N/A')}")
             
+            await asyncio.to_thread(dimension_cache.set, cache_key, result)
+            
             return result
             
         except json.JSONDecodeError as e:
@@ -589,22 +685,221 @@ Respond ONLY with valid JSON, no other text."""
             logger.error(f"❌ GPT dimension estimation failed: {e}")
             raise Exception(f"AI dimension estimation failed - please try again")
     
+    @staticmethod
+    async def estimate_many(
+        pairs: List[Tuple[str, str]],
+        room_sqcm: float,
+        product_service=None,
+        concurrency: int = ESTIMATE_CONCURRENCY
+    ) -> Dict[Tuple[str, str], Union[Dict[str, float], Exception]]:
+        """
+        Estimate several (furniture_type, subtype) pairs concurrently
+        
+        Identical pairs (case/whitespace-insensitive) are estimated once.
+        
+        Returns:
+            Dict mapping each input pair to its dimensions, or to the
+            exception raised while estimating it
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        unique = {}
+        for pair in pairs:
+            unique.setdefault(_pair_key(*pair), pair)
+        
+        async def estimate(furniture_type: str, subtype: str):
+            async with semaphore:
+                return await SpaceCalculator.estimate_furniture_size(
+                    furniture_type, subtype, room_sqcm, product_service
+                )
+        
+        logger.info(f"🤖 Estimating {len(unique)} unique items ({len(pairs)} requested, concurrency {concurrency})")
+        
+        results = await asyncio.gather(
+            *(estimate(*pair) for pair in unique.values()),
+            return_exceptions=True
+        )
+        by_key = dict(zip(unique, results))
+        
+        return {pair: by_key[_pair_key(*pair)] for pair in pairs}
+    
+    @staticmethod
+    async def estimate_batch(
+        pairs: List[Tuple[str, str]],
+        room_sqcm: float,
+        product_service=None,
+        batch_size: int = ESTIMATE_BATCH_SIZE
+    ) -> Dict[Tuple[str, str], Union[Dict[str, float], Exception]]:
+        """
+        Estimate several (furniture_type, subtype) pairs with one prompt per batch
+        
+        Pairs with known dimensions or a cached estimate skip the model. Entries it leaves out
+        or answers with unrealistic values are re-estimated one by one.
+        
+        Returns:
+            Dict mapping each input pair to its dimensions, or to the
+            exception raised while estimating it
+        """
+        unique = {}
+        for pair in pairs:
+            unique.setdefault(_pair_key(*pair), pair)
+        
+        by_key = {}
+        pending = []
+        joined = {}
+        for key, (furniture_type, subtype) in unique.items():
+            known = SpaceCalculator.known_dimensions(furniture_type, subtype, product_service)
+            if not known:
+                known = await asyncio.to_thread(
+                    dimension_cache.get, dimension_cache.make_key(furniture_type, subtype, room_sqcm)
+                )
+            if known:
+                by_key[key] = known
+                continue
+            
+            # Reuse single estimates already in flight instead of asking again
+            task = _inflight_estimates.get(dimension_cache.make_key(furniture_type, subtype, room_sqcm))
+            if task is not None:
+                joined[key] = task
+            else:
+                pending.append(key)
+        
+        batch_size = max(1, batch_size)
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        answers = await asyncio.gather(
+            *(SpaceCalculator._estimate_batch_prompt([unique[key] for key in batch], room_sqcm) for batch in batches),
+            *(asyncio.shield(task) for task in joined.values()),
+            return_exceptions=True
+        )
+        for batch, batch_answers in zip(batches, answers):
+            # A failed batch leaves its items unanswered, so they are retried one by one
+            if isinstance(batch_answers, BaseException):
+                logger.warning(f"⚠️ Batch estimate of {len(batch)} items failed: {batch_answers}")
+                continue
+            by_key.update(zip(batch, batch_answers))
+        for key, result in zip(joined, answers[len(batches):]):
+            by_key[key] = dict(result) if isinstance(result, dict) else result
+        
+        # Fall back to single estimates for entries the batch could not answer
+        missing = [unique[key] for key in pending if by_key.get(key) is None]
+        if missing:
+            logger.warning(f"⚠️ Batch estimate incomplete, estimating {len(missing)} items individually")
+            retried = await SpaceCalculator.estimate_many(missing, room_sqcm, product_service)
+            for pair, result in retried.items():
+                by_key[_pair_key(*pair)] = result
+        
+        return {pair: by_key[_pair_key(*pair)] for pair in pairs}
+    
+    @staticmethod
+    async def _estimate_batch_prompt(pairs: List[Tuple[str, str]], room_sqcm: float) -> List[Optional[Dict[str, float]]]:
+        """
+        Ask for dimensions of many pairs in one structured-JSON request
+        
+        Returns:
+            Validated dimensions per pair (same order), None where the
+            answer was missing or invalid
+        """
+        items = "\n".join(
+            f"{i}. Furniture Type: {furniture_type} | Subtype: {subtype}"
+            for i, (furniture_type, subtype) in enumerate(pairs)
+        )
+        
+        prompt = f"""You are an interior design expert. Estimate realistic dimensions for each furniture item below.
+
+Room Size: {room_sqcm:.1f} square centimeters
+
+Items:
+{items}
+
+Provide typical dimensions in CENTIMETERS as a JSON object (no markdown, just JSON):
+{{
+    "items": [
+        {{"index": <item number>, "width_cm": <width>, "depth_cm": <depth>, "height_cm": <height>, "notes": "<brief explanation>"}}
+    ]
+}}
+
+{REFERENCE_EXAMPLES}
+
+Important:
+1. Dimensions should be in CENTIMETERS (not inches or feet)
+2. Must be proportional to room size
+3. Should match typical furniture store measurements
+4. Floor footprint (width × depth) is most critical
+5. Return exactly one entry per item, with its item number as "index"
+
+Respond ONLY with valid JSON, no other text."""
+
+        try:
+            logger.info(f"🤖 GPT-4 estimating dimensions for {len(pairs)} items in one request")
+            
+            response = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a furniture dimension expert. Provide dimensions in CENTIMETERS. Respond only with valid JSON."
+                    },
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=100 + 80 * len(pairs),
+                response_format={"type": "json_object"}
+            )
+            
+            result_text = response.choices[0].message.content.strip()
+            result_text = result_text.replace("```json", "").replace("```", "").strip()
+            entries = json.loads(result_text).get("items", [])
+            
+        except Exception as e:
+            logger.error(f"❌ GPT batch dimension estimation failed: {e}")
+            return [None] * len(pairs)
+        
+        results: List[Optional[Dict[str, float]]] = [None] * len(pairs)
+        for entry in entries:
+            try:
+                index = int(entry.pop("index"))
+                if not 0 <= index < len(pairs) or results[index] is not None:
+                    continue
+                results[index] = SpaceCalculator.validate_dimensions(entry)
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                logger.warning(f"⚠️ Skipping invalid batch entry {entry}: {e}")
+        
+        for (furniture_type, subtype), result in zip(pairs, results):
+            if result is not None:
+                await asyncio.to_thread(
+                    dimension_cache.set, dimension_cache.make_key(furniture_type, subtype, room_sqcm), result
+                )
+        
+        return results
+    
     @staticmethod
     def validate_furniture_fit(
         room_length: float,
         room_width: float,
         room_sqcm: float,
         current_furniture: List[Dict],
-        new_furniture: Dict
+        new_furniture: Union[Dict, List[Dict]],
+        current_sqcm: Optional[float] = None,
+        room_type: Optional[str] = None
     ) -> Dict:
         """
         Validate if new furniture fits in room
         All calculations in square centimeters
+        
+        Besides the usage limit, the layout planner (the same one behind
+        plan_layout) must place every piece in the room_length x room_width
+        rectangle with walkway clearance; its layout is returned under
+        "layout".
+        
+        Pass current_sqcm (the session's running total) to skip re-summing
+        current_furniture.
         """
+        new_items = new_furniture if isinstance(new_furniture, list) else [new_furniture]
         
         # Calculate current usage
-        current_sqcm = sum(item.get("sqcm", 0) for item in current_furniture)
-        new_sqcm = new_furniture.get("sqcm", 0)
+        if current_sqcm is None:
+            current_sqcm = sum(item.get("sqcm", 0) for item in current_furniture)
+        new_sqcm = sum(item.get("sqcm", 0) for item in new_items)
         total_sqcm = current_sqcm + new_sqcm
         
         # Calculate usage percentage
@@ -614,8 +909,18 @@ Respond ONLY with valid JSON, no other text."""
         # Check if it fits
         fits = usage_percent <= MAX_ROOM_USAGE_PERCENT
         
+        layout = None
+        if fits and ROOM_PACKING_ENABLED and room_length and room_width:
+            layout = SpaceCalculator.plan_layout(room_length, room_width, list(current_furniture) + new_items, room_type)
+            fits = not layout["unplaced"]
+        
         if fits:
             message = f"✅ Furniture fits! Room usage: {usage_percent:.1f}% ({remaining_sqcm:.1f} sq cm remaining)"
+        elif layout is not None:
+            message = (
+                f"❌ No walkable layout! {', '.join(layout['unplaced'])} won't fit a "
+                f"{room_length:.0f} x {room_width:.0f} cm room with {MIN_WALKWAY_SPACE_CM:.0f} cm walkways"
+            )
         else:
             over_percent = usage_percent - MAX_ROOM_USAGE_PERCENT
             message = f"❌ Room too crowded! Usage would be {usage_percent:.1f}% (exceeds {MAX_ROOM_USAGE_PERCENT}% by {over_percent:.1f}%)"
@@ -628,50 +933,55 @@ Respond ONLY with valid JSON, no other text."""
             "total_sqcm": round(total_sqcm, 2),
             "remaining_sqcm": round(remaining_sqcm, 2),
             "max_usage": MAX_ROOM_USAGE_PERCENT,
+            "layout": layout,
             "message": message
         }
     
     @staticmethod
-    def get_placement_suggestions(
+    def plan_layout(
         room_length: float,
         room_width: float,
-        furniture_items: List[Dict]
-    ) -> str:
-        """Generate AI-powered placement suggestions"""
-        
-        furniture_list = "\n".join([
-            f"- {item.get('subtype', 'Item')}: {item.get('width_cm', 0):.1f} cm W × {item.get('depth_cm', 0):.1f} cm D ({item.get('sqcm', 0):.1f} sq cm)"
-            for item in furniture_items
-        ])
+        furniture_items: List[Dict],
+        room_type: Optional[str] = None
+    ) -> Dict:
+        """
+        Lay out furniture in the room with the local rule-based planner
+        (pieces its rules can't place get the room packer's free-floor search)
         
-        prompt = f"""You are an interior designer. Suggest optimal furniture placement.
+        Returns:
+            {"room", "placements", "unplaced", "summary"}; placements give
+            each item's corner and extent in cm from the back-left corner
+        """
+        planner = LayoutPlanner(room_length, room_width, room_type, MIN_WALKWAY_SPACE_CM)
+        return planner.plan([_packing_item(item) for item in furniture_items])
+    
+    @staticmethod
+    async def get_placement_suggestions(
+        room_length: float,
+        room_width: float,
+        furniture_items: List[Dict],
+        room_type: Optional[str] = None
+    ) -> str:
+        """Placement suggestions (text summary of the planned layout)"""
+        layout = SpaceCalculator.plan_layout(room_length, room_width, furniture_items, room_type)
+        return layout["summary"]
 
-Room Dimensions: {room_length} cm × {room_width} cm = {room_length * room_width:.1f} sq cm
 
-Furniture to arrange:
-{furniture_list}
+def _pair_key(furniture_type: str, subtype: str) -> Tuple[str, str]:
+    """Case/whitespace-insensitive identity of a (type, subtype) pair"""
+    return (furniture_type.strip().lower(), subtype.strip().lower())
 
-Provide 3-4 short, actionable placement tips. Consider:
-- Traffic flow (minimum 90 cm walkways)
-- Natural focal points (windows, doors)
-- Balance and visual symmetry
-- Functional layout and usability
 
-Be specific and practical."""
+def _packing_item(item: Dict) -> Dict:
+    """Flatten a selection ({type, subtype, dimensions, sqcm}) or bare dimensions for the packer"""
+    flat = dict(item.get("dimensions") or {})
+    flat.update((k, item[k]) for k in ("width_cm", "depth_cm", "height_cm", "sqcm", "type", "subtype") if k in item)
+    return flat
 
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are an interior designer providing concise placement advice."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=250
-            )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            logger.error(f"❌ Placement suggestion failed: {e}")
-            return "Place larger furniture against walls. Maintain 90 cm walkways. Create conversation areas with seating. Consider natural light when positioning."
\ No newline at end of file
+
+def _forget_estimate(cache_key: str, task: "asyncio.Task"):
+    """Drop a finished in-flight estimate (and mark its error as seen)"""
+    if _inflight_estimates.get(cache_key) is task:
+        del _inflight_estimates[cache_key]
+    if not task.cancelled():
+        task.exception()
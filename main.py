@@ -7,18 +7,25 @@ Main FastAPI Application
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 # ✅ CORRECT IMPORT (remove 'decorative')
 from ai_backend.api import upload, selection, furniture, generation
 from ai_backend.services.aws_service import init_aws_service
 from ai_backend.services.product_service import ProductService
+from ai_backend.services.dimension_cache import dimension_cache
+from ai_backend.services.space_calculator import client as openai_client
+from ai_backend.services.generation_jobs import generation_queue
+from ai_backend.services.fal_compositor import fal_compositor
+from ai_backend.services.image_cache import image_cache
 from ai_backend.config import (
     AWS_ACCESS_KEY_ID,
     AWS_SECRET_ACCESS_KEY,
     AWS_S3_BUCKET,
     AWS_REGION,
-    PRODUCT_API_URL
+    PRODUCT_API_URL,
+    PRODUCT_REFRESH_INTERVAL_SECONDS
 )
 
 logging.basicConfig(
@@ -47,9 +54,26 @@ async def lifespan(app: FastAPI):
     
     app.state.product_service = product_service
     
+    # Keep the catalog fresh without restarting (right away if we booted from a snapshot)
+    refresh_task = None
+    if PRODUCT_REFRESH_INTERVAL_SECONDS > 0 or product_service.loaded_from_snapshot:
+        refresh_task = asyncio.create_task(product_service.run_refresher(
+            PRODUCT_REFRESH_INTERVAL_SECONDS,
+            immediate=product_service.loaded_from_snapshot
+        ))
+    
+    generation_queue.start()
+    
     yield
     
     logger.info("🛑 Shutting down")
+    
+    if refresh_task:
+        refresh_task.cancel()
+    
+    await generation_queue.stop()
+    await fal_compositor.close()
+    await openai_client.close()
 
 
 app = FastAPI(
@@ -88,7 +112,10 @@ async def root():
 async def health():
     return {
         "status": "healthy",
-        "products": product_service.total_products if product_service else 0
+        "products": product_service.total_products if product_service else 0,
+        "dimension_cache": dimension_cache.stats(),
+        "generation_queue": generation_queue.stats(),
+        "image_cache": image_cache.stats()
     }
 
 